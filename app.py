@@ -3,6 +3,8 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import sqlite3
 import os
+import signal
+import sys
 import csv
 import json
 from datetime import datetime, timedelta
@@ -16,8 +18,10 @@ from reportlab.lib import colors
 from reportlab.lib.units import inch
 import io
 import random
+from frontend.json_provider import RowJSONProvider
 
 app = Flask(__name__)
+app.json = RowJSONProvider(app)
 app.secret_key = 'your-secret-key-change-this-in-production'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -1510,10 +1514,12 @@ def generate_seating_arrangement(exam_date, session_time, numbering_scheme='alph
         # Implement seating algorithm
         allocated_students = []
         room_occupancy = {}
+        room_neighbors = {}
         
         # Initialize room occupancy
         for room in rooms:
             room_occupancy[room['room_id']] = []
+            room_neighbors[room['room_id']] = {}
             for row in range(room['rows']):
                 room_occupancy[room['room_id']].append([None] * room['cols'])
         
@@ -1529,6 +1535,7 @@ def generate_seating_arrangement(exam_date, session_time, numbering_scheme='alph
                     break
                 
                 room_grid = room_occupancy[room['room_id']]
+                neighbor_subjects = room_neighbors[room['room_id']]
                 
                 for row in range(room['rows']):
                     if allocated:
@@ -1537,9 +1544,11 @@ def generate_seating_arrangement(exam_date, session_time, numbering_scheme='alph
                     for col in range(room['cols']):
                         if room_grid[row][col] is None:
                             # Check for conflicts with adjacent seats
-                            if not has_conflict(student, room_grid, row, col):
+                            if not has_conflict(student, neighbor_subjects, row, col):
                                 # Allocate seat
                                 room_grid[row][col] = student
+                                update_neighbor_subjects(neighbor_subjects, student, row, col,
+                                                         room['rows'], room['cols'])
                                 
                                 # Generate seat number
                                 seat_number = generate_seat_number(room['room_id'], row + 1, col + 1, numbering_scheme, room['cols'])
@@ -1580,27 +1589,20 @@ def generate_seating_arrangement(exam_date, session_time, numbering_scheme='alph
         traceback.print_exc()
         return False, str(e)
 
-def has_conflict(student, room_grid, row, col):
+def has_conflict(student, neighbor_subjects, row, col):
     """Check if placing student at this position creates a conflict"""
-    # Check adjacent seats for same subject (more lenient than department)
-    # Only check immediate left, right, front, and back (not diagonals)
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    
-    for dr, dc in directions:
-        new_row, new_col = row + dr, col + dc
-        
-        if (0 <= new_row < len(room_grid) and 
-            0 <= new_col < len(room_grid[0]) and 
-            room_grid[new_row][new_col] is not None):
-            
-            adjacent_student = room_grid[new_row][new_col]
-            
-            # Only prevent same subject students from sitting adjacent
-            # (Allow same department but different subjects)
-            if adjacent_student['subject_code'] == student['subject_code']:
-                return True
-    
-    return False
+    # Only prevent same subject students from sitting adjacent
+    # (Allow same department but different subjects)
+    return student['subject_code'] in neighbor_subjects.get((row, col), ())
+
+def update_neighbor_subjects(neighbor_subjects, student, row, col, rows, cols):
+    """Record a placed student's subject on its front, back, left and right seats"""
+    # Diagonals are not considered adjacent
+    subject_code = student['subject_code']
+    for new_row, new_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+        if 0 <= new_row < rows and 0 <= new_col < cols:
+            neighbor_subjects[(new_row, new_col)] = (
+                neighbor_subjects.get((new_row, new_col), ()) + (subject_code,))
 
 def generate_seat_number(room_id, row, col, numbering_scheme='sequential', max_cols=20):
     """Generate seat number based on different numbering schemes"""
@@ -1706,12 +1708,7 @@ def seating_session_exams():
             WHERE e.exam_date = ? AND e.start_time = ?
             ORDER BY s.subject_name
         ''', (exam_date, session_time)).fetchall()
-        exams = [{
-            'subject_code': r['subject_code'],
-            'subject_name': r['subject_name'],
-            'student_count': r['student_count']
-        } for r in rows]
-        return jsonify({'success': True, 'exams': exams})
+        return jsonify({'success': True, 'exams': rows})
     finally:
         conn.close()
 
@@ -1728,7 +1725,7 @@ def view_seating():
     conn = get_db_connection()
     
     # Get seating arrangements
-    arrangements_rows = conn.execute('''
+    arrangements = conn.execute('''
         SELECT sa.*, s.name as student_name, sub.subject_name, r.name as room_name
         FROM seating_arrangements sa
         JOIN students s ON sa.student_id = s.student_id
@@ -1737,21 +1734,15 @@ def view_seating():
         WHERE sa.exam_date = ? AND sa.session_time = ?
         ORDER BY sa.room_id, sa.seat_number, sa.seat_row, sa.seat_col
     ''', (exam_date, session_time)).fetchall()
-    
-    # Convert Row objects to dictionaries for JSON serialization
-    arrangements = [dict(row) for row in arrangements_rows]
-    
+
     # Get rooms used
-    rooms_rows = conn.execute('''
+    rooms = conn.execute('''
         SELECT DISTINCT r.*
         FROM rooms r
         JOIN seating_arrangements sa ON r.room_id = sa.room_id
         WHERE sa.exam_date = ? AND sa.session_time = ?
     ''', (exam_date, session_time)).fetchall()
-    
-    # Convert Room objects to dictionaries for consistency
-    rooms = [dict(row) for row in rooms_rows]
-    
+
     conn.close()
     
     return render_template('seating/view.html', 
@@ -1764,4 +1755,6 @@ def view_seating():
 init_db()
 
 if __name__ == '__main__':
+    # Exit normally on SIGTERM (docker stop) so atexit handlers still flush and close
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
     app.run(debug=True)
\ No newline at end of file
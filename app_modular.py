@@ -3,6 +3,8 @@ Modular Flask Application for Examination Seating System
 """
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file
 import os
+import signal
+import sys
 from datetime import datetime, timedelta
 
 # Import backend modules
@@ -13,10 +15,12 @@ from backend.reports import report_generator
 
 # Import frontend modules
 from frontend.routes import register_blueprints
+from frontend.json_provider import RowJSONProvider
 
 def create_app():
     """Application factory pattern"""
     app = Flask(__name__)
+    app.json = RowJSONProvider(app)
     
     # Configuration
     app.secret_key = 'your-secret-key-change-this-in-production'
@@ -83,18 +87,13 @@ def create_app():
         department = request.args.get('department', '')
         semester = request.args.get('semester', '')
         
-        students = Student.get_all(
+        students = Student.search(
+            query,
             department=department if department else None,
-            semester=int(semester) if semester else None,
-            search=query if query else None
+            semester=int(semester) if semester else None
         )
         
-        return jsonify([{
-            'id': s.student_id,
-            'name': s.name,
-            'department': s.department,
-            'semester': s.semester
-        } for s in students[:20]])  # Limit to 20 results
+        return jsonify(list(students))
     
     @app.route('/api/subjects/search')
     def api_search_subjects():
@@ -102,17 +101,12 @@ def create_app():
         query = request.args.get('q', '')
         department = request.args.get('department', '')
         
-        subjects = Subject.get_all(
-            department=department if department else None,
-            search=query if query else None
+        subjects = Subject.search(
+            query,
+            department=department if department else None
         )
         
-        return jsonify([{
-            'code': s.subject_code,
-            'name': s.subject_name,
-            'department': s.department,
-            'semester': s.semester
-        } for s in subjects[:20]])
+        return jsonify(list(subjects))
     
     @app.route('/api/rooms/availability')
     def api_room_availability():
@@ -303,10 +297,17 @@ def create_app():
     
     return app
 
+def handle_sigterm():
+    """Exit normally on SIGTERM so atexit still runs db_manager.flush_logs"""
+    # Without this, docker stop and process manager restarts lose buffered audit rows
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
 # Create the application
 app = create_app()
 
 if __name__ == '__main__':
+    handle_sigterm()
+    
     # Initialize database
     db_manager.init_database()
     
@@ -3,276 +3,727 @@ Database management module for the Examination Seating System
 """
 import sqlite3
 import os
-from werkzeug.security import generate_password_hash
+import atexit
+import logging
+import queue
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 
+# Precomputed werkzeug hash of the default admin password 'admin123', so the
+# first start does not spend ~100 ms in scrypt inside the schema transaction
+DEFAULT_ADMIN_PASSWORD_HASH = (
+    'scrypt:32768:8:1$PQMHiWM9X5J2vF7R$27da0b23f23f931ab82f5f63fa98adbeacc382456a8c9785534805b40759b0e2'
+    '608c5996e5262d920cc58d017057db3fda5a10869867c2ed47f7226fe064b8f7'
+)
+
+# INTEGER copies of the TEXT join keys on seating_arrangements:
+# (surrogate column, parent table, shared TEXT key)
+SEATING_SURROGATE_KEYS = (
+    ('student_pk', 'students', 'student_id'),
+    ('subject_pk', 'subjects', 'subject_code'),
+    ('room_pk', 'rooms', 'room_id'),
+)
+
+# FTS5 tables mirroring searchable columns; filled from their content table when first created
+SEARCH_INDEX_TABLES = ('students_fts', 'subjects_fts', 'invigilators_fts')
+
+# Full schema, run as one script inside a single transaction by init_database
+SCHEMA_SQL = '''
+BEGIN;
+
+-- Admin table
+CREATE TABLE IF NOT EXISTS admins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT DEFAULT 'admin',
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Students table
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    department TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    email TEXT,
+    phone TEXT,
+    address TEXT,
+    guardian_name TEXT,
+    guardian_phone TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Subjects table
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_code TEXT UNIQUE NOT NULL,
+    subject_name TEXT NOT NULL,
+    department TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    credits INTEGER DEFAULT 3,
+    subject_type TEXT DEFAULT 'theory',
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Student-Subject mapping
+CREATE TABLE IF NOT EXISTS student_subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    enrollment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT 1,
+    FOREIGN KEY (student_id) REFERENCES students (student_id),
+    FOREIGN KEY (subject_code) REFERENCES subjects (subject_code),
+    UNIQUE(student_id, subject_code)
+);
+
+-- Rooms table
+CREATE TABLE IF NOT EXISTS rooms (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_id TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    capacity INTEGER NOT NULL,
+    building TEXT,
+    floor INTEGER,
+    room_type TEXT DEFAULT 'classroom',
+    facilities TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Exams table
+CREATE TABLE IF NOT EXISTS exams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_code TEXT NOT NULL,
+    exam_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    duration INTEGER NOT NULL,
+    session_type TEXT DEFAULT 'regular',
+    exam_type TEXT DEFAULT 'written',
+    instructions TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (subject_code) REFERENCES subjects (subject_code)
+);
+
+-- Seating arrangements table
+CREATE TABLE IF NOT EXISTS seating_arrangements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    room_id TEXT NOT NULL,
+    seat_row INTEGER NOT NULL,
+    seat_col INTEGER NOT NULL,
+    exam_date DATE NOT NULL,
+    session_time TEXT NOT NULL,
+    arrangement_id TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    student_pk INTEGER,
+    subject_pk INTEGER,
+    room_pk INTEGER,
+    FOREIGN KEY (student_id) REFERENCES students (student_id),
+    FOREIGN KEY (subject_code) REFERENCES subjects (subject_code),
+    FOREIGN KEY (room_id) REFERENCES rooms (room_id),
+    UNIQUE(room_id, seat_row, seat_col, exam_date, session_time)
+);
+
+-- Invigilators table
+CREATE TABLE IF NOT EXISTS invigilators (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    staff_id TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT,
+    phone TEXT,
+    department TEXT,
+    designation TEXT,
+    experience INTEGER DEFAULT 0,
+    max_assignments INTEGER DEFAULT 2,
+    preferences TEXT,
+    availability TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Invigilator assignments table
+CREATE TABLE IF NOT EXISTS invigilator_assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    staff_id TEXT NOT NULL,
+    room_id TEXT NOT NULL,
+    exam_date DATE NOT NULL,
+    session_time TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    assignment_type TEXT DEFAULT 'primary',
+    notes TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (staff_id) REFERENCES invigilators (staff_id),
+    FOREIGN KEY (room_id) REFERENCES rooms (room_id),
+    FOREIGN KEY (subject_code) REFERENCES subjects (subject_code)
+);
+
+-- System logs table
+CREATE TABLE IF NOT EXISTS system_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    action TEXT NOT NULL,
+    table_name TEXT,
+    record_id TEXT,
+    old_values TEXT,
+    new_values TEXT,
+    ip_address TEXT,
+    user_agent TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES admins (id)
+);
+
+-- Reports table
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_name TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    file_path TEXT,
+    file_size INTEGER,
+    parameters TEXT,
+    generated_by INTEGER,
+    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (generated_by) REFERENCES admins (id)
+);
+
+-- Fill the seating surrogate keys for rows inserted without them (e.g. by
+-- app.py) and re-point them when a parent row is re-created under the same key
+CREATE TRIGGER IF NOT EXISTS trg_seating_surrogate_keys
+AFTER INSERT ON seating_arrangements
+WHEN NEW.student_pk IS NULL OR NEW.subject_pk IS NULL OR NEW.room_pk IS NULL
+BEGIN
+    UPDATE seating_arrangements SET
+        student_pk = (SELECT id FROM students WHERE student_id = NEW.student_id),
+        subject_pk = (SELECT id FROM subjects WHERE subject_code = NEW.subject_code),
+        room_pk = (SELECT id FROM rooms WHERE room_id = NEW.room_id)
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_students_seating_student_pk
+AFTER INSERT ON students
+BEGIN
+    UPDATE seating_arrangements SET student_pk = NEW.id WHERE student_id = NEW.student_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_subjects_seating_subject_pk
+AFTER INSERT ON subjects
+BEGIN
+    UPDATE seating_arrangements SET subject_pk = NEW.id WHERE subject_code = NEW.subject_code;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rooms_seating_room_pk
+AFTER INSERT ON rooms
+BEGIN
+    UPDATE seating_arrangements SET room_pk = NEW.id WHERE room_id = NEW.room_id;
+END;
+
+-- Trigram full-text indexes behind the substring search on list pages
+CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+    student_id, name, content='students', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_students_fts_insert AFTER INSERT ON students
+BEGIN
+    INSERT INTO students_fts(rowid, student_id, name) VALUES (NEW.id, NEW.student_id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_students_fts_delete AFTER DELETE ON students
+BEGIN
+    INSERT INTO students_fts(students_fts, rowid, student_id, name) VALUES ('delete', OLD.id, OLD.student_id, OLD.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_students_fts_update AFTER UPDATE OF student_id, name ON students
+BEGIN
+    INSERT INTO students_fts(students_fts, rowid, student_id, name) VALUES ('delete', OLD.id, OLD.student_id, OLD.name);
+    INSERT INTO students_fts(rowid, student_id, name) VALUES (NEW.id, NEW.student_id, NEW.name);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS subjects_fts USING fts5(
+    subject_code, subject_name, content='subjects', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_subjects_fts_insert AFTER INSERT ON subjects
+BEGIN
+    INSERT INTO subjects_fts(rowid, subject_code, subject_name) VALUES (NEW.id, NEW.subject_code, NEW.subject_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_subjects_fts_delete AFTER DELETE ON subjects
+BEGIN
+    INSERT INTO subjects_fts(subjects_fts, rowid, subject_code, subject_name) VALUES ('delete', OLD.id, OLD.subject_code, OLD.subject_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_subjects_fts_update AFTER UPDATE OF subject_code, subject_name ON subjects
+BEGIN
+    INSERT INTO subjects_fts(subjects_fts, rowid, subject_code, subject_name) VALUES ('delete', OLD.id, OLD.subject_code, OLD.subject_name);
+    INSERT INTO subjects_fts(rowid, subject_code, subject_name) VALUES (NEW.id, NEW.subject_code, NEW.subject_name);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS invigilators_fts USING fts5(
+    staff_id, name, content='invigilators', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_invigilators_fts_insert AFTER INSERT ON invigilators
+BEGIN
+    INSERT INTO invigilators_fts(rowid, staff_id, name) VALUES (NEW.id, NEW.staff_id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invigilators_fts_delete AFTER DELETE ON invigilators
+BEGIN
+    INSERT INTO invigilators_fts(invigilators_fts, rowid, staff_id, name) VALUES ('delete', OLD.id, OLD.staff_id, OLD.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invigilators_fts_update AFTER UPDATE OF staff_id, name ON invigilators
+BEGIN
+    INSERT INTO invigilators_fts(invigilators_fts, rowid, staff_id, name) VALUES ('delete', OLD.id, OLD.staff_id, OLD.name);
+    INSERT INTO invigilators_fts(rowid, staff_id, name) VALUES (NEW.id, NEW.staff_id, NEW.name);
+END;
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_students_department ON students(department);
+CREATE INDEX IF NOT EXISTS idx_students_semester ON students(semester);
+CREATE INDEX IF NOT EXISTS idx_subjects_department ON subjects(department);
+CREATE INDEX IF NOT EXISTS idx_exams_date ON exams(exam_date);
+CREATE INDEX IF NOT EXISTS idx_seating_room ON seating_arrangements(room_id);
+CREATE INDEX IF NOT EXISTS idx_students_active ON students(is_active) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_seating_room_date ON seating_arrangements(exam_date, room_id);
+
+-- Foreign key columns used in joins (student_subjects.student_id is
+-- already covered by its UNIQUE(student_id, subject_code) index)
+CREATE INDEX IF NOT EXISTS idx_ss_subject ON student_subjects(subject_code);
+CREATE INDEX IF NOT EXISTS idx_sa_student ON seating_arrangements(student_id);
+CREATE INDEX IF NOT EXISTS idx_sa_subject ON seating_arrangements(subject_code);
+CREATE INDEX IF NOT EXISTS idx_ia_staff ON invigilator_assignments(staff_id);
+CREATE INDEX IF NOT EXISTS idx_ia_room_date ON invigilator_assignments(room_id, exam_date, session_time);
+CREATE INDEX IF NOT EXISTS idx_exams_subject ON exams(subject_code);
+CREATE INDEX IF NOT EXISTS idx_sa_student_pk ON seating_arrangements(student_pk);
+CREATE INDEX IF NOT EXISTS idx_sa_subject_pk ON seating_arrangements(subject_pk);
+CREATE INDEX IF NOT EXISTS idx_sa_room_pk ON seating_arrangements(room_pk);
+CREATE INDEX IF NOT EXISTS idx_sa_room_date_session
+    ON seating_arrangements(room_id, exam_date, session_time, is_active) WHERE is_active = 1;
+-- Per-session lookups; covers the count and rooms-used statistics and
+-- supersedes the older (exam_date, session_time) index
+DROP INDEX IF EXISTS idx_seating_exam;
+CREATE INDEX IF NOT EXISTS idx_sa_session
+    ON seating_arrangements(exam_date, session_time, is_active, room_id);
+
+-- Filter + ORDER BY indexes for the model get_all() list queries
+CREATE INDEX IF NOT EXISTS idx_students_list
+    ON students(department, semester, name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_subjects_list
+    ON subjects(department, semester, subject_name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_rooms_list
+    ON rooms(building, floor, name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_exams_list
+    ON exams(exam_date, start_time) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_invigilators_list
+    ON invigilators(department, name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_ss_subject_active_student
+    ON student_subjects(subject_code, is_active, student_id);
+
+-- Create default admin if not exists
+INSERT INTO admins (email, password_hash, name, role)
+SELECT 'admin@exam.com', '{admin_password_hash}', 'System Administrator', 'super_admin'
+WHERE NOT EXISTS (SELECT 1 FROM admins);
+
+-- Refresh planner statistics so the indexes above are picked up
+ANALYZE;
+
+COMMIT;
+'''.replace('{admin_password_hash}', DEFAULT_ADMIN_PASSWORD_HASH)
+
+# Per-connection prepared statement cache size (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 1024
+
+# Audit log rows are buffered and written by a background thread in batches
+LOG_QUEUE_SIZE = 10000
+LOG_FLUSH_INTERVAL = 0.25
+
+# Attempts, and the base delay in seconds between them, for a batch hitting a locked database
+LOG_WRITE_ATTEMPTS = 5
+LOG_RETRY_DELAY = 0.5
+
+# Reclaim free pages with VACUUM once they exceed this many bytes
+VACUUM_FREELIST_BYTES = 10 * 1024 * 1024
+
+# Default lifetime in seconds of results cached by query(cached=True)
+QUERY_CACHE_TTL = 30
+
+# Most results kept by query(cached=True); the oldest entry is evicted first
+QUERY_CACHE_SIZE = 4096
+
+LOG_ACTION_QUERY = '''
+    INSERT INTO system_logs 
+    (user_id, action, table_name, record_id, old_values, new_values, ip_address, user_agent)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+STATISTICS_TABLES = ('students', 'subjects', 'rooms', 'exams', 'invigilators', 'seating_arrangements')
+STATISTICS_KEYS = tuple(f'total_{table}' for table in STATISTICS_TABLES) + (
+    'active_students', 'upcoming_exams', 'rooms_in_use')
+STATISTICS_QUERY = 'SELECT ' + ', '.join(
+    [f'(SELECT COUNT(*) FROM {table}) AS total_{table}' for table in STATISTICS_TABLES] + [
+        '(SELECT COUNT(*) FROM students WHERE is_active = 1) AS active_students',
+        '(SELECT COUNT(*) FROM exams WHERE exam_date >= date("now")) AS upcoming_exams',
+        '''(SELECT COUNT(DISTINCT room_id) FROM seating_arrangements 
+            WHERE exam_date >= date("now")) AS rooms_in_use'''
+    ])
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def _insert_statement(table, columns, on_conflict=None):
+    """Build (once) the INSERT statement used by bulk_insert"""
+    verb = f'INSERT OR {on_conflict}' if on_conflict else 'INSERT'
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
 class DatabaseManager:
     def __init__(self, db_path='exam_system.db'):
         self.db_path = db_path
+        self._local = threading.local()
+        # Open connection -> weakref to its owning thread (None for the shared audit log connection)
+        self._thread_conns = {}
+        self._thread_conns_lock = threading.Lock()
+        self._query_cache = {}
+        self._query_cache_lock = threading.Lock()
+        # Bumped by every clear so reads that raced a commit are not cached
+        self._query_cache_generation = 0
+        # PRAGMA data_version last seen on _version_conn; changes on commits from any other connection
+        self._query_cache_version = None
+        self._version_conn = None
+        self._log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._log_pending = threading.Event()
+        self._log_lock = threading.Lock()
+        self._log_writer = None
+        self._log_conn = None
         self.init_database()
+        atexit.register(self.close_connections)
+        # Registered last so it runs first and still has a connection to write with
+        atexit.register(self.flush_logs)
     
-    def get_connection(self):
+    def get_connection(self, check_same_thread=True):
         """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread,
+                               cached_statements=STATEMENT_CACHE_SIZE)
         conn.row_factory = sqlite3.Row
+        # journal_mode=WAL is persistent and set once in init_database
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA mmap_size=1073741824')
+        return conn
+    
+    def _get_thread_conn(self):
+        """Get the long-lived connection owned by the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only the owning thread uses it; the flag lets other threads close it
+            conn = self.get_connection(check_same_thread=False)
+            self._local.conn = conn
+            thread = threading.current_thread()
+            with self._thread_conns_lock:
+                dead = self._prune_thread_conns()
+                self._thread_conns[conn] = weakref.ref(thread)
+            for old in dead:
+                old.close()
+            # Close it as soon as the finished thread is garbage collected
+            weakref.finalize(thread, self._release_thread_conn, conn).atexit = False
         return conn
     
+    def _prune_thread_conns(self):
+        """Drop and return connections whose owning thread has exited; caller holds the lock"""
+        dead = []
+        for conn, owner in list(self._thread_conns.items()):
+            thread = owner() if owner is not None else None
+            if owner is not None and (thread is None or not thread.is_alive()):
+                del self._thread_conns[conn]
+                dead.append(conn)
+        return dead
+    
+    def _release_thread_conn(self, conn):
+        """Close the connection of a thread that has exited"""
+        with self._thread_conns_lock:
+            if conn not in self._thread_conns:
+                return
+            del self._thread_conns[conn]
+        conn.close()
+    
+    def close_connections(self):
+        """Close all per-thread connections"""
+        with self._thread_conns_lock:
+            conns, self._thread_conns = list(self._thread_conns), {}
+            self._log_conn = None
+            self._version_conn = None
+        for conn in conns:
+            try:
+                # Cheap; only re-analyzes tables whose statistics went stale
+                conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass
+            conn.close()
+        self._local = threading.local()
+    
     def init_database(self):
         """Initialize database with all required tables"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Admin table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admins (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                name TEXT NOT NULL,
-                role TEXT DEFAULT 'admin',
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Students table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                department TEXT NOT NULL,
-                semester INTEGER NOT NULL,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                guardian_name TEXT,
-                guardian_phone TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Subjects table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS subjects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                subject_code TEXT UNIQUE NOT NULL,
-                subject_name TEXT NOT NULL,
-                department TEXT NOT NULL,
-                semester INTEGER NOT NULL,
-                credits INTEGER DEFAULT 3,
-                subject_type TEXT DEFAULT 'theory',
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Student-Subject mapping
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS student_subjects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                subject_code TEXT NOT NULL,
-                enrollment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1,
-                FOREIGN KEY (student_id) REFERENCES students (student_id),
-                FOREIGN KEY (subject_code) REFERENCES subjects (subject_code),
-                UNIQUE(student_id, subject_code)
-            )
-        ''')
-        
-        # Rooms table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS rooms (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                room_id TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                rows INTEGER NOT NULL,
-                cols INTEGER NOT NULL,
-                capacity INTEGER NOT NULL,
-                building TEXT,
-                floor INTEGER,
-                room_type TEXT DEFAULT 'classroom',
-                facilities TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Exams table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS exams (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                subject_code TEXT NOT NULL,
-                exam_date DATE NOT NULL,
-                start_time TIME NOT NULL,
-                end_time TIME NOT NULL,
-                duration INTEGER NOT NULL,
-                session_type TEXT DEFAULT 'regular',
-                exam_type TEXT DEFAULT 'written',
-                instructions TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (subject_code) REFERENCES subjects (subject_code)
-            )
-        ''')
-        
-        # Seating arrangements table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS seating_arrangements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                subject_code TEXT NOT NULL,
-                room_id TEXT NOT NULL,
-                seat_row INTEGER NOT NULL,
-                seat_col INTEGER NOT NULL,
-                exam_date DATE NOT NULL,
-                session_time TEXT NOT NULL,
-                arrangement_id TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (student_id) REFERENCES students (student_id),
-                FOREIGN KEY (subject_code) REFERENCES subjects (subject_code),
-                FOREIGN KEY (room_id) REFERENCES rooms (room_id),
-                UNIQUE(room_id, seat_row, seat_col, exam_date, session_time)
-            )
-        ''')
-        
-        # Invigilators table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS invigilators (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                staff_id TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                email TEXT,
-                phone TEXT,
-                department TEXT,
-                designation TEXT,
-                experience INTEGER DEFAULT 0,
-                max_assignments INTEGER DEFAULT 2,
-                preferences TEXT,
-                availability TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Invigilator assignments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS invigilator_assignments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                staff_id TEXT NOT NULL,
-                room_id TEXT NOT NULL,
-                exam_date DATE NOT NULL,
-                session_time TEXT NOT NULL,
-                subject_code TEXT NOT NULL,
-                assignment_type TEXT DEFAULT 'primary',
-                notes TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (staff_id) REFERENCES invigilators (staff_id),
-                FOREIGN KEY (room_id) REFERENCES rooms (room_id),
-                FOREIGN KEY (subject_code) REFERENCES subjects (subject_code)
-            )
-        ''')
-        
-        # System logs table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS system_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                action TEXT NOT NULL,
-                table_name TEXT,
-                record_id TEXT,
-                old_values TEXT,
-                new_values TEXT,
-                ip_address TEXT,
-                user_agent TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES admins (id)
-            )
-        ''')
-        
-        # Reports table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                report_name TEXT NOT NULL,
-                report_type TEXT NOT NULL,
-                file_path TEXT,
-                file_size INTEGER,
-                parameters TEXT,
-                generated_by INTEGER,
-                generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (generated_by) REFERENCES admins (id)
-            )
-        ''')
-        
-        # Create default admin if not exists
-        cursor.execute('SELECT COUNT(*) FROM admins')
-        if cursor.fetchone()[0] == 0:
-            default_password = generate_password_hash('admin123')
-            cursor.execute('''
-                INSERT INTO admins (email, password_hash, name, role)
-                VALUES (?, ?, ?, ?)
-            ''', ('admin@exam.com', default_password, 'System Administrator', 'super_admin'))
-        
-        # Create indexes for better performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_department ON students(department)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_semester ON students(semester)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_subjects_department ON subjects(department)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_exams_date ON exams(exam_date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_seating_exam ON seating_arrangements(exam_date, session_time)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_seating_room ON seating_arrangements(room_id)')
+        conn.execute('PRAGMA journal_mode=WAL')
+        self._add_surrogate_keys(conn)
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.executescript(SCHEMA_SQL)
+        self._rebuild_search_indexes(conn, [t for t in SEARCH_INDEX_TABLES if t not in existing])
+        self._vacuum_if_fragmented(conn)
+        # Gather statistics for newly created indexes so the planner can pick them up
+        conn.execute('PRAGMA optimize')
+        conn.close()
         
+        # Warm the result cache used by the dashboard
+        self.get_statistics()
+    
+    def _vacuum_if_fragmented(self, conn):
+        """VACUUM at startup when deleted pages waste more than VACUUM_FREELIST_BYTES"""
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        if free_pages * page_size > VACUUM_FREELIST_BYTES:
+            conn.execute('VACUUM')
+    
+    def _add_surrogate_keys(self, conn):
+        """Add and backfill the seating surrogate key columns on existing databases"""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(seating_arrangements)')}
+        missing = [key for key in SEATING_SURROGATE_KEYS if key[0] not in columns]
+        if not columns or not missing:
+            # Fresh database (the schema creates them) or already migrated
+            return
+        conn.execute('BEGIN')
+        for pk_column, parent, key in missing:
+            conn.execute(f'ALTER TABLE seating_arrangements ADD COLUMN {pk_column} INTEGER')
+            conn.execute(f'''
+                UPDATE seating_arrangements SET {pk_column} = 
+                (SELECT id FROM {parent} WHERE {parent}.{key} = seating_arrangements.{key})
+            ''')
         conn.commit()
-        conn.close()
     
-    def execute_query(self, query, params=None, fetch_one=False, fetch_all=True):
-        """Execute a query and return results"""
-        conn = self.get_connection()
+    def _rebuild_search_indexes(self, conn, tables):
+        """Index rows that existed before the full-text tables were added"""
+        if not tables:
+            return
+        with conn:
+            for table in tables:
+                conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    
+    @contextmanager
+    def transaction(self):
+        """Group several statements on this thread into a single transaction"""
+        conn = self._get_thread_conn()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                if fetch_one:
-                    result = cursor.fetchone()
-                elif fetch_all:
-                    result = cursor.fetchall()
-                else:
-                    result = cursor
-            else:
+            yield conn
+        except Exception:
+            conn.rollback()
+            self.clear_query_cache()
+            raise
+        conn.commit()
+        self.clear_query_cache()
+    
+    def clear_query_cache(self):
+        """Drop all cached query results"""
+        with self._query_cache_lock:
+            self._query_cache_generation += 1
+            self._query_cache.clear()
+    
+    def _check_data_version(self):
+        """Clear the query cache if any connection, in this process or another, committed since the last check"""
+        with self._query_cache_lock:
+            if self._version_conn is None:
+                # Never writes, so its data_version moves with every other connection's commits
+                self._version_conn = self.get_connection(check_same_thread=False)
+                with self._thread_conns_lock:
+                    self._thread_conns[self._version_conn] = None
+            version = self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+            if version != self._query_cache_version:
+                self._query_cache_version = version
+                self._query_cache_generation += 1
+                self._query_cache.clear()
+    
+    def query(self, sql, params=None, one=False, cached=False, ttl=QUERY_CACHE_TTL, tuples=False):
+        """Run a SELECT and return all rows, or only the first with one=True"""
+        # Reads inside a transaction may see uncommitted rows; never share them
+        if cached and not self._get_thread_conn().in_transaction:
+            self._check_data_version()
+            key = (sql, tuple(params) if params else None, one, tuples)
+            entry = self._query_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1] if one else list(entry[1])
+            generation = self._query_cache_generation
+            result = self.query(sql, params, one, tuples=tuples)
+            with self._query_cache_lock:
+                # A write committed during the read; its result may already be stale
+                if generation == self._query_cache_generation:
+                    if len(self._query_cache) >= QUERY_CACHE_SIZE:
+                        self._query_cache.pop(next(iter(self._query_cache), None), None)
+                    self._query_cache[key] = (time.monotonic() + ttl, result)
+            return result if one else list(result)
+        
+        cursor = self._get_thread_conn().cursor()
+        if tuples:
+            # Plain tuples skip the per-row sqlite3.Row allocation
+            cursor.row_factory = None
+        cursor.execute(sql, params or ())
+        return cursor.fetchone() if one else cursor.fetchall()
+    
+    def execute(self, sql, params=None):
+        """Run a write statement and return the affected row count"""
+        conn = self._get_thread_conn()
+        # Inside a caller-managed transaction the caller commits or rolls back
+        managed = conn.in_transaction
+        try:
+            cursor = conn.execute(sql, params or ())
+            if not managed:
                 conn.commit()
-                result = cursor.rowcount
-            
-            return result
         except Exception as e:
-            conn.rollback()
+            if not managed:
+                conn.rollback()
             raise e
+        self.clear_query_cache()
+        return cursor.rowcount
+    
+    def execute_query(self, query, params=None, fetch_one=False, fetch_all=True,
+                      cached=False, ttl=QUERY_CACHE_TTL):
+        """Execute a query and return results (prefer query() or execute())"""
+        if query.lstrip()[:6].upper() != 'SELECT':
+            return self.execute(query, params)
+        if fetch_one or fetch_all:
+            return self.query(query, params, one=fetch_one, cached=cached, ttl=ttl)
+        return self._get_thread_conn().execute(query, params or ())
+    
+    def stream_query(self, query, params=None, arraysize=1000, tuples=False):
+        """Yield rows of a SELECT in batches instead of materialising them all"""
+        cursor = self._get_thread_conn().cursor()
+        cursor.arraysize = arraysize
+        if tuples:
+            cursor.row_factory = None
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield from rows
         finally:
-            conn.close()
+            cursor.close()
+    
+    def bulk_insert(self, table, columns, rows, chunk=500, on_conflict=None):
+        """Insert many rows in a single transaction and return the row count"""
+        query = _insert_statement(table, tuple(columns), on_conflict)
+        rows = list(rows)
+        with self.transaction() as conn:
+            for start in range(0, len(rows), chunk):
+                conn.executemany(query, rows[start:start + chunk])
+        self.clear_query_cache()
+        return len(rows)
     
     def log_action(self, user_id, action, table_name=None, record_id=None, 
                    old_values=None, new_values=None, ip_address=None, user_agent=None):
         """Log user actions for audit trail"""
-        query = '''
-            INSERT INTO system_logs 
-            (user_id, action, table_name, record_id, old_values, new_values, ip_address, user_agent)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        '''
         params = (user_id, action, table_name, record_id, old_values, new_values, ip_address, user_agent)
-        self.execute_query(query, params)
+        while True:
+            try:
+                self._log_queue.put_nowait(params)
+                break
+            except queue.Full:
+                # Drop the oldest entry rather than block the request; another
+                # producer may take the freed slot first, so try again
+                try:
+                    self._log_queue.get_nowait()
+                    logger.warning('Audit log queue full; dropped the oldest entry')
+                except queue.Empty:
+                    pass
+        try:
+            self._start_log_writer()
+        except RuntimeError:
+            # Threads cannot start during interpreter shutdown; atexit flushes instead
+            return
+        self._log_pending.set()
+    
+    def flush_logs(self):
+        """Write all buffered audit log rows in one transaction"""
+        with self._log_lock:
+            rows = []
+            while True:
+                try:
+                    rows.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if rows:
+                self._write_log_rows(rows)
+    
+    def _write_log_rows(self, rows):
+        """Insert a batch of audit rows, retrying while the database is locked"""
+        for attempt in range(1, LOG_WRITE_ATTEMPTS + 1):
+            try:
+                if self._log_conn is None:
+                    # Dedicated connection, only ever used under _log_lock
+                    self._log_conn = self.get_connection(check_same_thread=False)
+                    with self._thread_conns_lock:
+                        self._thread_conns[self._log_conn] = None
+                with self._log_conn:
+                    self._log_conn.executemany(LOG_ACTION_QUERY, rows)
+                return
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == LOG_WRITE_ATTEMPTS:
+                    logger.error('Dropped %d audit log rows: %s', len(rows), e)
+                    return
+                logger.warning('Audit log write attempt %d failed (%s); retrying', attempt, e)
+                time.sleep(LOG_RETRY_DELAY * attempt)
+            except sqlite3.Error as e:
+                logger.error('Dropped %d audit log rows: %s', len(rows), e)
+                return
+    
+    def _start_log_writer(self):
+        """Start the background audit log writer on first use"""
+        if self._log_writer is None:
+            with self._log_lock:
+                if self._log_writer is None:
+                    self._log_writer = threading.Thread(target=self._run_log_writer,
+                                                        name='audit-log-writer', daemon=True)
+                    self._log_writer.start()
+    
+    def _run_log_writer(self):
+        """Flush buffered audit log rows every LOG_FLUSH_INTERVAL seconds"""
+        while True:
+            self._log_pending.wait()
+            time.sleep(LOG_FLUSH_INTERVAL)
+            self._log_pending.clear()
+            try:
+                self.flush_logs()
+            except Exception:
+                # Failed batches are logged by _write_log_rows; never stop the writer thread
+                logger.exception('Audit log writer failed to flush')
     
     def backup_database(self, backup_path=None):
         """Create a backup of the database"""
@@ -281,36 +732,23 @@ class DatabaseManager:
             backup_path = f'backup_exam_system_{timestamp}.db'
         
         # Create backup directory if it doesn't exist
-        backup_dir = os.path.dirname(backup_path) or 'backups'
-        os.makedirs(backup_dir, exist_ok=True)
+        backup_dir = os.path.dirname(backup_path)
+        if backup_dir:
+            os.makedirs(backup_dir, exist_ok=True)
         
-        # Copy database file
-        import shutil
-        shutil.copy2(self.db_path, backup_path)
+        # Online backup gives a consistent snapshot even while the WAL is active
+        dst = sqlite3.connect(backup_path)
+        try:
+            self._get_thread_conn().backup(dst, pages=1024)
+        finally:
+            dst.close()
         return backup_path
     
     def get_statistics(self):
         """Get system statistics"""
-        stats = {}
-        
-        # Count records in each table
-        tables = ['students', 'subjects', 'rooms', 'exams', 'invigilators', 'seating_arrangements']
-        for table in tables:
-            count = self.execute_query(f'SELECT COUNT(*) FROM {table}', fetch_one=True)[0]
-            stats[f'total_{table}'] = count
-        
-        # Additional statistics
-        stats['active_students'] = self.execute_query(
-            'SELECT COUNT(*) FROM students WHERE is_active = 1', fetch_one=True)[0]
-        
-        stats['upcoming_exams'] = self.execute_query(
-            'SELECT COUNT(*) FROM exams WHERE exam_date >= date("now")', fetch_one=True)[0]
-        
-        stats['rooms_in_use'] = self.execute_query(
-            '''SELECT COUNT(DISTINCT room_id) FROM seating_arrangements 
-               WHERE exam_date >= date("now")''', fetch_one=True)[0]
-        
-        return stats
+        # All counts come back from a single statement
+        row = self.query(STATISTICS_QUERY, one=True, cached=True, tuples=True)
+        return dict(zip(STATISTICS_KEYS, row))
 
 # Global database instance
 db_manager = DatabaseManager()
\ No newline at end of file
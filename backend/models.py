@@ -2,32 +2,181 @@
 Data models for the Examination Seating System
 """
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
 from backend.database import db_manager
 import json
+import time
+
+# Typeahead search results are cached briefly; writes clear the cache
+SEARCH_CACHE_TTL = 30  # seconds
+
+def _ttl_bucket():
+    """Return a value that changes every SEARCH_CACHE_TTL seconds"""
+    return int(time.monotonic() // SEARCH_CACHE_TTL)
+
+# Most values bound into one IN (...) list, well under SQLite's variable limit
+IN_CLAUSE_CHUNK = 500
+
+# The trigram full-text indexes can only answer substrings of 3+ characters
+FTS_MIN_SEARCH = 3
+
+def _fts_phrase(search):
+    """Quote a search term as an FTS5 phrase so it matches as a plain substring"""
+    return '"' + search.replace('"', '""') + '"'
+
+@lru_cache(maxsize=None)
+def _search_conditions(table, columns):
+    """Build the FTS and LIKE search conditions for a table once"""
+    return (f'id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)',
+            '(' + ' OR '.join(f'{column} LIKE ?' for column in columns) + ')')
+
+def _search_filter(table, search, columns):
+    """Return the (condition, params) filter for a list-page search box"""
+    if not search:
+        return None, None
+    fts_condition, like_condition = _search_conditions(table, columns)
+    if len(search) >= FTS_MIN_SEARCH:
+        return fts_condition, _fts_phrase(search)
+    pattern = f'%{search}%'
+    return like_condition, (pattern,) * len(columns)
+
+@lru_cache(maxsize=256)
+def _compose_select(table, conditions, order_by, limited):
+    """Build the get_all SELECT for one combination of active filters"""
+    query = f"SELECT * FROM {table} WHERE {' AND '.join(('is_active = 1',) + conditions)} ORDER BY {order_by}"
+    return query + ' LIMIT ?' if limited else query
 
 class BaseModel:
     """Base model class with common functionality"""
     
+    # Subclasses list their table columns here; instances carry no __dict__
+    __slots__ = ()
+    
+    # Table and column order used by bulk_save
+    table = None
+    insert_columns = ()
+    
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
-            setattr(self, key, value)
+            if key in self.__slots__:
+                setattr(self, key, value)
+    
+    @classmethod
+    def _from_row(cls, row):
+        """Build an instance straight from a database row, skipping __init__"""
+        obj = cls.__new__(cls)
+        for key in row.keys():
+            if key in cls.__slots__:
+                setattr(obj, key, row[key])
+        return obj
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # One C-level getter that reads every column in a single call
+        cls._fields = tuple(field for field in cls.__slots__ if not field.startswith('_'))
+        cls._field_getter = attrgetter(*cls._fields)
     
     def to_dict(self):
         """Convert model to dictionary"""
-        return {key: value for key, value in self.__dict__.items() 
-                if not key.startswith('_')}
+        try:
+            return dict(zip(self._fields, self._field_getter(self)))
+        except AttributeError:
+            # Unsaved objects may not have id or timestamps yet
+            return {key: getattr(self, key) for key in self._fields 
+                    if hasattr(self, key)}
     
     def save(self):
         """Save model to database"""
         raise NotImplementedError("Subclasses must implement save method")
     
+    @classmethod
+    def iter_all(cls, page_size=1000, **filters):
+        """Yield objects matching get_all() filters, fetching page_size rows at a time"""
+        return cls.get_all(page_size=page_size, **filters)
+    
+    @classmethod
+    def _select_active(cls, filters, order_by, limit=None, page_size=None):
+        """Fetch active rows matching the (condition, value) filters whose value is not None"""
+        conditions = []
+        params = []
+        for condition, value in filters:
+            if value is None:
+                continue
+            conditions.append(condition)
+            if isinstance(value, tuple):
+                params.extend(value)
+            else:
+                params.append(value)
+        if limit:
+            params.append(limit)
+        query = _compose_select(cls.table, tuple(conditions), order_by, bool(limit))
+        if page_size:
+            # Lazy generator for exports; only one page of rows is held at a time
+            return map(cls._from_row, db_manager.stream_query(query, params, arraysize=page_size))
+        results = db_manager.execute_query(query, params)
+        return [cls._from_row(row) for row in results]
+    
+    @classmethod
+    def bulk_save(cls, objs, chunk_size=500):
+        """Insert many new objects with executemany in a single transaction"""
+        if not cls.insert_columns:
+            raise NotImplementedError("Subclasses must define table and insert_columns")
+        rows = [tuple(getattr(obj, column) for column in cls.insert_columns) for obj in objs]
+        return db_manager.bulk_insert(cls.table, cls.insert_columns, rows, chunk=chunk_size)
+    
     def delete(self):
         """Delete model from database"""
         raise NotImplementedError("Subclasses must implement delete method")
 
+# SQL statements used by Student
+_SQL_STUDENT_UPDATE = '''
+    UPDATE students SET name=?, department=?, semester=?, email=?, 
+    phone=?, address=?, guardian_name=?, guardian_phone=?, is_active=?, 
+    updated_at=CURRENT_TIMESTAMP WHERE student_id=?
+'''
+_SQL_STUDENT_INSERT = '''
+    INSERT INTO students (student_id, name, department, semester, email, 
+    phone, address, guardian_name, guardian_phone, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_STUDENT_SOFT_DELETE = 'UPDATE students SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE student_id=?'
+_SQL_STUDENT_PREFIX_MATCH = 'SELECT student_id, name FROM students WHERE is_active = 1 AND ({prefixes}) ORDER BY name'
+_SQL_STUDENT_PREFIX_SOFT_DELETE = '''
+    UPDATE students SET is_active=0, updated_at=CURRENT_TIMESTAMP
+    WHERE is_active = 1 AND ({prefixes})
+'''
+_SQL_STUDENT_SUBJECTS = '''
+    SELECT s.* FROM subjects s
+    JOIN student_subjects ss ON s.subject_code = ss.subject_code
+    WHERE ss.student_id = ? AND ss.is_active = 1
+'''
+_SQL_STUDENT_SUBJECT_CODES_MANY = '''
+    SELECT ss.student_id, s.subject_code FROM subjects s
+    JOIN student_subjects ss ON s.subject_code = ss.subject_code
+    WHERE ss.student_id IN ({ids}) AND ss.is_active = 1
+    ORDER BY ss.student_id, ss.subject_code
+'''
+_SQL_STUDENT_ENROLL = '''
+    INSERT OR REPLACE INTO student_subjects (student_id, subject_code, is_active)
+    VALUES (?, ?, 1)
+'''
+_SQL_STUDENT_UNENROLL = '''
+    UPDATE student_subjects SET is_active=0 
+    WHERE student_id=? AND subject_code=?
+'''
+_SQL_STUDENT_GET = 'SELECT * FROM students WHERE student_id = ? AND is_active = 1'
+
 class Student(BaseModel):
     """Student model"""
     
+    __slots__ = ('id', 'student_id', 'name', 'department', 'semester', 'email', 'phone', 'address',
+                 'guardian_name', 'guardian_phone', 'is_active', 'created_at', 'updated_at')
+    
+    table = 'students'
+    insert_columns = ('student_id', 'name', 'department', 'semester', 'email', 'phone',
+                      'address', 'guardian_name', 'guardian_phone', 'is_active')
+    
     def __init__(self, student_id=None, name=None, department=None, semester=None, 
                  email=None, phone=None, address=None, guardian_name=None, 
                  guardian_phone=None, is_active=True, **kwargs):
@@ -47,89 +196,162 @@ class Student(BaseModel):
         """Save student to database"""
         if hasattr(self, 'id') and self.id:
             # Update existing student
-            query = '''
-                UPDATE students SET name=?, department=?, semester=?, email=?, 
-                phone=?, address=?, guardian_name=?, guardian_phone=?, is_active=?, 
-                updated_at=CURRENT_TIMESTAMP WHERE student_id=?
-            '''
+            query = _SQL_STUDENT_UPDATE
             params = (self.name, self.department, self.semester, self.email, 
                      self.phone, self.address, self.guardian_name, self.guardian_phone, 
                      self.is_active, self.student_id)
         else:
             # Insert new student
-            query = '''
-                INSERT INTO students (student_id, name, department, semester, email, 
-                phone, address, guardian_name, guardian_phone, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+            query = _SQL_STUDENT_INSERT
             params = (self.student_id, self.name, self.department, self.semester, 
                      self.email, self.phone, self.address, self.guardian_name, 
                      self.guardian_phone, self.is_active)
         
-        return db_manager.execute_query(query, params)
+        result = db_manager.execute_query(query, params)
+        _search_students.cache_clear()
+        return result
     
     def delete(self):
         """Soft delete student"""
-        query = 'UPDATE students SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE student_id=?'
-        return db_manager.execute_query(query, (self.student_id,))
+        query = _SQL_STUDENT_SOFT_DELETE
+        result = db_manager.execute_query(query, (self.student_id,))
+        _search_students.cache_clear()
+        return result
+    
+    @classmethod
+    def delete_by_prefix(cls, prefixes):
+        """Soft delete every active student whose ID starts with one of the prefixes"""
+        prefixes = list(prefixes)
+        if not prefixes:
+            return []
+        # substr keeps the match case-sensitive, like str.startswith
+        condition = ' OR '.join(['substr(student_id, 1, ?) = ?'] * len(prefixes))
+        params = [value for prefix in prefixes for value in (len(prefix), prefix)]
+        with db_manager.transaction() as conn:
+            deleted = conn.execute(_SQL_STUDENT_PREFIX_MATCH.format(prefixes=condition), params).fetchall()
+            conn.execute(_SQL_STUDENT_PREFIX_SOFT_DELETE.format(prefixes=condition), params)
+        _search_students.cache_clear()
+        return deleted
     
     def get_subjects(self):
         """Get subjects enrolled by this student"""
-        query = '''
-            SELECT s.* FROM subjects s
-            JOIN student_subjects ss ON s.subject_code = ss.subject_code
-            WHERE ss.student_id = ? AND ss.is_active = 1
-        '''
+        query = _SQL_STUDENT_SUBJECTS
         return db_manager.execute_query(query, (self.student_id,))
     
+    @classmethod
+    def get_subject_codes_multi(cls, student_ids):
+        """Get the subject codes enrolled by each of several students, keyed by student ID"""
+        ids = list(dict.fromkeys(student_ids))
+        codes = {student_id: [] for student_id in ids}
+        for start in range(0, len(ids), IN_CLAUSE_CHUNK):
+            chunk = ids[start:start + IN_CLAUSE_CHUNK]
+            query = _SQL_STUDENT_SUBJECT_CODES_MANY.format(ids=', '.join('?' * len(chunk)))
+            for student_id, subject_code in db_manager.query(query, chunk, tuples=True):
+                codes[student_id].append(subject_code)
+        return codes
+    
     def enroll_subject(self, subject_code):
         """Enroll student in a subject"""
-        query = '''
-            INSERT OR REPLACE INTO student_subjects (student_id, subject_code, is_active)
-            VALUES (?, ?, 1)
-        '''
+        query = _SQL_STUDENT_ENROLL
         return db_manager.execute_query(query, (self.student_id, subject_code))
     
     def unenroll_subject(self, subject_code):
         """Unenroll student from a subject"""
-        query = '''
-            UPDATE student_subjects SET is_active=0 
-            WHERE student_id=? AND subject_code=?
-        '''
+        query = _SQL_STUDENT_UNENROLL
         return db_manager.execute_query(query, (self.student_id, subject_code))
     
+    def enroll_many(self, subject_codes):
+        """Enroll student in several subjects in one transaction"""
+        return Student.bulk_enroll((self.student_id, code) for code in subject_codes)
+    
+    def unenroll_many(self, subject_codes):
+        """Unenroll student from several subjects in one transaction"""
+        return Student.bulk_unenroll((self.student_id, code) for code in subject_codes)
+    
+    @classmethod
+    def bulk_enroll(cls, pairs):
+        """Enroll many (student_id, subject_code) pairs with executemany"""
+        rows = [(student_id, subject_code, 1) for student_id, subject_code in pairs]
+        return db_manager.bulk_insert('student_subjects', ('student_id', 'subject_code', 'is_active'),
+                                      rows, on_conflict='REPLACE')
+    
+    @classmethod
+    def bulk_unenroll(cls, pairs):
+        """Unenroll many (student_id, subject_code) pairs with executemany"""
+        rows = list(pairs)
+        with db_manager.transaction() as conn:
+            cursor = conn.executemany(_SQL_STUDENT_UNENROLL, rows)
+        return cursor.rowcount
+    
     @classmethod
     def get_by_id(cls, student_id):
         """Get student by ID"""
-        query = 'SELECT * FROM students WHERE student_id = ? AND is_active = 1'
-        result = db_manager.execute_query(query, (student_id,), fetch_one=True)
-        return cls(**dict(result)) if result else None
+        query = _SQL_STUDENT_GET
+        result = db_manager.execute_query(query, (student_id,), fetch_one=True, cached=True)
+        return cls._from_row(result) if result else None
     
     @classmethod
-    def get_all(cls, department=None, semester=None, search=None):
+    def get_all(cls, department=None, semester=None, search=None, limit=None, page_size=None):
         """Get all students with optional filters"""
-        query = 'SELECT * FROM students WHERE is_active = 1'
-        params = []
-        
-        if department:
-            query += ' AND department = ?'
-            params.append(department)
-        
-        if semester:
-            query += ' AND semester = ?'
-            params.append(semester)
-        
-        if search:
-            query += ' AND (name LIKE ? OR student_id LIKE ?)'
-            params.extend([f'%{search}%', f'%{search}%'])
-        
-        query += ' ORDER BY name'
-        results = db_manager.execute_query(query, params)
-        return [cls(**dict(row)) for row in results]
+        return cls._select_active((
+            ('department = ?', department or None),
+            ('semester = ?', semester or None),
+            _search_filter('students', search, ('name', 'student_id')),
+        ), 'name', limit, page_size)
+    
+    @classmethod
+    def search(cls, query=None, department=None, semester=None, limit=20):
+        """Lightweight cached student lookup for typeahead search"""
+        query = query.strip().lower() if query else None
+        return _search_students(query, department, semester, limit, _ttl_bucket())
+    
+    @classmethod
+    def bulk_save(cls, objs, chunk_size=500):
+        """Insert many new objects and invalidate the search cache"""
+        result = super().bulk_save(objs, chunk_size)
+        _search_students.cache_clear()
+        return result
+
+# SQL statements used by Subject
+_SQL_SUBJECT_UPDATE = '''
+    UPDATE subjects SET subject_name=?, department=?, semester=?, 
+    credits=?, subject_type=?, is_active=?, updated_at=CURRENT_TIMESTAMP 
+    WHERE subject_code=?
+'''
+_SQL_SUBJECT_INSERT = '''
+    INSERT INTO subjects (subject_code, subject_name, department, 
+    semester, credits, subject_type, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_SUBJECT_SOFT_DELETE = 'UPDATE subjects SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE subject_code=?'
+_SQL_SUBJECT_ENROLLED_STUDENTS = '''
+    SELECT s.* FROM students s
+    JOIN student_subjects ss ON s.student_id = ss.student_id
+    WHERE ss.subject_code = ? AND ss.is_active = 1 AND s.is_active = 1
+'''
+_SQL_SUBJECT_ENROLLED_STUDENTS_MANY = '''
+    SELECT ss.subject_code, s.* FROM students s
+    JOIN student_subjects ss ON s.student_id = ss.student_id
+    WHERE ss.subject_code IN ({codes}) AND ss.is_active = 1 AND s.is_active = 1
+'''
+_SQL_SUBJECT_ENROLLED_COUNTS_MANY = '''
+    SELECT ss.subject_code, COUNT(*) FROM students s
+    JOIN student_subjects ss ON s.student_id = ss.student_id
+    WHERE ss.subject_code IN ({codes}) AND ss.is_active = 1 AND s.is_active = 1
+    GROUP BY ss.subject_code
+'''
+_SQL_SUBJECT_GET = 'SELECT * FROM subjects WHERE subject_code = ? AND is_active = 1'
 
 class Subject(BaseModel):
     """Subject model"""
     
+    __slots__ = ('id', 'subject_code', 'subject_name', 'department', 'semester', 'credits',
+                 'subject_type', 'is_active', 'created_at', 'updated_at')
+    
+    table = 'subjects'
+    insert_columns = ('subject_code', 'subject_name', 'department', 'semester', 'credits',
+                      'subject_type', 'is_active')
+    
     def __init__(self, subject_code=None, subject_name=None, department=None, 
                  semester=None, credits=3, subject_type='theory', is_active=True, **kwargs):
         super().__init__(**kwargs)
@@ -145,71 +367,120 @@ class Subject(BaseModel):
         """Save subject to database"""
         if hasattr(self, 'id') and self.id:
             # Update existing subject
-            query = '''
-                UPDATE subjects SET subject_name=?, department=?, semester=?, 
-                credits=?, subject_type=?, is_active=?, updated_at=CURRENT_TIMESTAMP 
-                WHERE subject_code=?
-            '''
+            query = _SQL_SUBJECT_UPDATE
             params = (self.subject_name, self.department, self.semester, 
                      self.credits, self.subject_type, self.is_active, self.subject_code)
         else:
             # Insert new subject
-            query = '''
-                INSERT INTO subjects (subject_code, subject_name, department, 
-                semester, credits, subject_type, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            '''
+            query = _SQL_SUBJECT_INSERT
             params = (self.subject_code, self.subject_name, self.department, 
                      self.semester, self.credits, self.subject_type, self.is_active)
         
-        return db_manager.execute_query(query, params)
+        result = db_manager.execute_query(query, params)
+        _search_subjects.cache_clear()
+        return result
     
     def delete(self):
         """Soft delete subject"""
-        query = 'UPDATE subjects SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE subject_code=?'
-        return db_manager.execute_query(query, (self.subject_code,))
+        query = _SQL_SUBJECT_SOFT_DELETE
+        result = db_manager.execute_query(query, (self.subject_code,))
+        _search_subjects.cache_clear()
+        return result
     
     def get_enrolled_students(self):
         """Get students enrolled in this subject"""
-        query = '''
-            SELECT s.* FROM students s
-            JOIN student_subjects ss ON s.student_id = ss.student_id
-            WHERE ss.subject_code = ? AND ss.is_active = 1 AND s.is_active = 1
-        '''
+        query = _SQL_SUBJECT_ENROLLED_STUDENTS
         return db_manager.execute_query(query, (self.subject_code,))
     
+    @classmethod
+    def get_enrolled_students_multi(cls, subject_codes):
+        """Get students enrolled in each of several subjects, keyed by subject code"""
+        codes = list(dict.fromkeys(subject_codes))
+        enrolled = {code: [] for code in codes}
+        for start in range(0, len(codes), IN_CLAUSE_CHUNK):
+            chunk = codes[start:start + IN_CLAUSE_CHUNK]
+            query = _SQL_SUBJECT_ENROLLED_STUDENTS_MANY.format(codes=', '.join('?' * len(chunk)))
+            for row in db_manager.query(query, chunk):
+                enrolled[row['subject_code']].append(row)
+        return enrolled
+    
+    @classmethod
+    def count_enrolled_multi(cls, subject_codes):
+        """Count students enrolled in each of several subjects, keyed by subject code"""
+        codes = list(dict.fromkeys(subject_codes))
+        counts = dict.fromkeys(codes, 0)
+        for start in range(0, len(codes), IN_CLAUSE_CHUNK):
+            chunk = codes[start:start + IN_CLAUSE_CHUNK]
+            query = _SQL_SUBJECT_ENROLLED_COUNTS_MANY.format(codes=', '.join('?' * len(chunk)))
+            counts.update(db_manager.query(query, chunk, tuples=True))
+        return counts
+    
     @classmethod
     def get_by_code(cls, subject_code):
         """Get subject by code"""
-        query = 'SELECT * FROM subjects WHERE subject_code = ? AND is_active = 1'
-        result = db_manager.execute_query(query, (subject_code,), fetch_one=True)
-        return cls(**dict(result)) if result else None
+        query = _SQL_SUBJECT_GET
+        result = db_manager.execute_query(query, (subject_code,), fetch_one=True, cached=True)
+        return cls._from_row(result) if result else None
     
     @classmethod
-    def get_all(cls, department=None, semester=None, search=None):
+    def get_all(cls, department=None, semester=None, search=None, limit=None, page_size=None):
         """Get all subjects with optional filters"""
-        query = 'SELECT * FROM subjects WHERE is_active = 1'
-        params = []
-        
-        if department:
-            query += ' AND department = ?'
-            params.append(department)
-        
-        if semester:
-            query += ' AND semester = ?'
-            params.append(semester)
-        
-        if search:
-            query += ' AND (subject_name LIKE ? OR subject_code LIKE ?)'
-            params.extend([f'%{search}%', f'%{search}%'])
-        
-        query += ' ORDER BY subject_name'
-        results = db_manager.execute_query(query, params)
-        return [cls(**dict(row)) for row in results]
+        return cls._select_active((
+            ('department = ?', department or None),
+            ('semester = ?', semester or None),
+            _search_filter('subjects', search, ('subject_name', 'subject_code')),
+        ), 'subject_name', limit, page_size)
+    
+    @classmethod
+    def search(cls, query=None, department=None, semester=None, limit=20):
+        """Lightweight cached subject lookup for typeahead search"""
+        query = query.strip().lower() if query else None
+        return _search_subjects(query, department, semester, limit, _ttl_bucket())
+    
+    @classmethod
+    def bulk_save(cls, objs, chunk_size=500):
+        """Insert many new objects and invalidate the search cache"""
+        result = super().bulk_save(objs, chunk_size)
+        _search_subjects.cache_clear()
+        return result
+
+# SQL statements used by Room
+_SQL_ROOM_UPDATE = '''
+    UPDATE rooms SET name=?, rows=?, cols=?, capacity=?, building=?, 
+    floor=?, room_type=?, facilities=?, is_active=?, updated_at=CURRENT_TIMESTAMP 
+    WHERE room_id=?
+'''
+_SQL_ROOM_INSERT = '''
+    INSERT INTO rooms (room_id, name, rows, cols, capacity, building, 
+    floor, room_type, facilities, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_ROOM_SOFT_DELETE = 'UPDATE rooms SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE room_id=?'
+_SQL_ROOM_OCCUPANCY = '''
+    SELECT COUNT(*) FROM seating_arrangements 
+    WHERE room_id = ? AND exam_date = ? AND session_time = ? AND is_active = 1
+'''
+_SQL_ROOM_BOOKED = '''
+    SELECT EXISTS(SELECT 1 FROM seating_arrangements 
+    WHERE room_id = ? AND exam_date = ? AND session_time = ? AND is_active = 1)
+'''
+_SQL_ROOM_OCCUPANCY_MANY = '''
+    SELECT exam_date, session_time, COUNT(*) FROM seating_arrangements 
+    WHERE room_id = ? AND is_active = 1 AND (exam_date, session_time) IN (VALUES {slots})
+    GROUP BY exam_date, session_time
+'''
+_SQL_ROOM_GET = 'SELECT * FROM rooms WHERE room_id = ? AND is_active = 1'
 
 class Room(BaseModel):
     """Room model"""
     
+    __slots__ = ('id', 'room_id', 'name', 'rows', 'cols', 'capacity', 'building', 'floor',
+                 'room_type', 'facilities', 'is_active', 'created_at', 'updated_at')
+    
+    table = 'rooms'
+    insert_columns = ('room_id', 'name', 'rows', 'cols', 'capacity', 'building', 'floor',
+                      'room_type', 'facilities', 'is_active')
+    
     def __init__(self, room_id=None, name=None, rows=None, cols=None, capacity=None,
                  building=None, floor=None, room_type='classroom', facilities=None, 
                  is_active=True, **kwargs):
@@ -225,34 +496,43 @@ class Room(BaseModel):
         self.facilities = facilities
         self.is_active = is_active
     
-    def save(self):
-        """Save room to database with validation"""
+    def save(self, validated=False):
+        """Save room to database with validation; validated=True skips the checks"""
         # Validate room data
-        self._validate()
+        if not validated:
+            self._validate()
         
         if hasattr(self, 'id') and self.id:
             # Update existing room
-            query = '''
-                UPDATE rooms SET name=?, rows=?, cols=?, capacity=?, building=?, 
-                floor=?, room_type=?, facilities=?, is_active=?, updated_at=CURRENT_TIMESTAMP 
-                WHERE room_id=?
-            '''
+            query = _SQL_ROOM_UPDATE
             params = (self.name, self.rows, self.cols, self.capacity, self.building,
                      self.floor, self.room_type, self.facilities, self.is_active, self.room_id)
         else:
             # Insert new room
-            query = '''
-                INSERT INTO rooms (room_id, name, rows, cols, capacity, building, 
-                floor, room_type, facilities, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+            query = _SQL_ROOM_INSERT
             params = (self.room_id, self.name, self.rows, self.cols, self.capacity,
                      self.building, self.floor, self.room_type, self.facilities, self.is_active)
         
         return db_manager.execute_query(query, params)
     
+    @classmethod
+    def bulk_save(cls, objs, chunk_size=500, validated=False):
+        """Validate and insert many new rooms in a single transaction"""
+        objs = list(objs)
+        if not validated:
+            for room in objs:
+                room._validate()
+        return super().bulk_save(objs, chunk_size)
+    
     def _validate(self):
         """Validate room data"""
+        rows, cols, capacity = self.rows, self.cols, self.capacity
+        # Fast path for well-formed rooms; anything else falls through to the detailed checks
+        if (type(rows) is int and type(cols) is int and type(capacity) is int
+                and rows > 0 and cols > 0 and capacity == rows * cols
+                and self.room_id and self.room_id.strip() and self.name and self.name.strip()):
+            return
+        
         if not self.room_id or not self.room_id.strip():
             raise ValueError("Room ID is required")
         
@@ -275,64 +555,86 @@ class Room(BaseModel):
     
     def delete(self):
         """Soft delete room"""
-        query = 'UPDATE rooms SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE room_id=?'
+        query = _SQL_ROOM_SOFT_DELETE
         return db_manager.execute_query(query, (self.room_id,))
     
-    def is_available(self, exam_date, session_time):
-        """Check if room is available for given date and time"""
-        query = '''
-            SELECT COUNT(*) FROM seating_arrangements 
-            WHERE room_id = ? AND exam_date = ? AND session_time = ? AND is_active = 1
-        '''
-        result = db_manager.execute_query(query, (self.room_id, exam_date, session_time), fetch_one=True)
-        return result[0] == 0
-    
-    def get_occupancy(self, exam_date, session_time):
-        """Get current occupancy for given date and time"""
-        query = '''
-            SELECT COUNT(*) FROM seating_arrangements 
-            WHERE room_id = ? AND exam_date = ? AND session_time = ? AND is_active = 1
-        '''
+    def get_status(self, exam_date, session_time):
+        """Get occupancy and free seats for given date and time in one query"""
+        query = _SQL_ROOM_OCCUPANCY
         result = db_manager.execute_query(query, (self.room_id, exam_date, session_time), fetch_one=True)
         occupied = result[0] if result else 0
         return {
             'occupied': occupied,
             'capacity': self.capacity,
+            'available': self.capacity - occupied,
             'occupancy_rate': (occupied / self.capacity * 100) if self.capacity > 0 else 0
         }
     
+    def is_available(self, exam_date, session_time):
+        """Check if room is available for given date and time"""
+        query = _SQL_ROOM_BOOKED
+        result = db_manager.execute_query(query, (self.room_id, exam_date, session_time), fetch_one=True)
+        return result[0] == 0
+    
+    def is_available_many(self, slots):
+        """Check availability for many (exam_date, session_time) pairs in one query"""
+        slots = list(dict.fromkeys(slots))
+        if not slots:
+            return {}
+        query = _SQL_ROOM_OCCUPANCY_MANY.format(slots=', '.join(['(?, ?)'] * len(slots)))
+        params = [self.room_id]
+        for exam_date, session_time in slots:
+            params.extend((exam_date, session_time))
+        booked = {(row[0], row[1]) for row in db_manager.query(query, params, tuples=True)}
+        return {slot: slot not in booked for slot in slots}
+    
+    def get_occupancy(self, exam_date, session_time):
+        """Get current occupancy for given date and time"""
+        return self.get_status(exam_date, session_time)
+    
     @classmethod
     def get_by_id(cls, room_id):
         """Get room by ID"""
-        query = 'SELECT * FROM rooms WHERE room_id = ? AND is_active = 1'
-        result = db_manager.execute_query(query, (room_id,), fetch_one=True)
-        return cls(**dict(result)) if result else None
+        query = _SQL_ROOM_GET
+        result = db_manager.execute_query(query, (room_id,), fetch_one=True, cached=True)
+        return cls._from_row(result) if result else None
     
     @classmethod
-    def get_all(cls, building=None, floor=None, room_type=None):
+    def get_all(cls, building=None, floor=None, room_type=None, page_size=None):
         """Get all rooms with optional filters"""
-        query = 'SELECT * FROM rooms WHERE is_active = 1'
-        params = []
-        
-        if building:
-            query += ' AND building = ?'
-            params.append(building)
-        
-        if floor is not None:
-            query += ' AND floor = ?'
-            params.append(floor)
-        
-        if room_type:
-            query += ' AND room_type = ?'
-            params.append(room_type)
-        
-        query += ' ORDER BY building, floor, name'
-        results = db_manager.execute_query(query, params)
-        return [cls(**dict(row)) for row in results]
+        return cls._select_active((
+            ('building = ?', building or None),
+            ('floor = ?', floor),
+            ('room_type = ?', room_type or None),
+        ), 'building, floor, name', page_size=page_size)
+
+# SQL statements used by Exam
+_SQL_EXAM_UPDATE = '''
+    UPDATE exams SET subject_code=?, exam_date=?, start_time=?, 
+    end_time=?, duration=?, session_type=?, exam_type=?, instructions=?, 
+    is_active=?, updated_at=CURRENT_TIMESTAMP WHERE id=?
+'''
+_SQL_EXAM_INSERT = '''
+    INSERT INTO exams (subject_code, exam_date, start_time, end_time, 
+    duration, session_type, exam_type, instructions, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING id
+'''
+_SQL_EXAM_SOFT_DELETE = 'UPDATE exams SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE id=?'
+_SQL_EXAM_ENROLLED_STUDENTS = '''
+    SELECT s.* FROM students s
+    JOIN student_subjects ss ON s.student_id = ss.student_id
+    WHERE ss.subject_code = ? AND ss.is_active = 1 AND s.is_active = 1
+'''
+_SQL_EXAM_GET = 'SELECT * FROM exams WHERE id = ? AND is_active = 1'
 
 class Exam(BaseModel):
     """Exam model"""
     
+    __slots__ = ('id', 'subject_code', 'exam_date', 'start_time', 'end_time', 'duration',
+                 'session_type', 'exam_type', 'instructions', 'is_active', 'created_at', 'updated_at')
+    
+    table = 'exams'
+    
     def __init__(self, subject_code=None, exam_date=None, start_time=None, 
                  end_time=None, duration=None, session_type='regular', 
                  exam_type='written', instructions=None, is_active=True, **kwargs):
@@ -351,86 +653,75 @@ class Exam(BaseModel):
         """Save exam to database"""
         if hasattr(self, 'id') and self.id:
             # Update existing exam
-            query = '''
-                UPDATE exams SET subject_code=?, exam_date=?, start_time=?, 
-                end_time=?, duration=?, session_type=?, exam_type=?, instructions=?, 
-                is_active=?, updated_at=CURRENT_TIMESTAMP WHERE id=?
-            '''
+            query = _SQL_EXAM_UPDATE
             params = (self.subject_code, self.exam_date, self.start_time, 
                      self.end_time, self.duration, self.session_type, self.exam_type,
                      self.instructions, self.is_active, self.id)
             return db_manager.execute_query(query, params)
         else:
             # Insert new exam
-            query = '''
-                INSERT INTO exams (subject_code, exam_date, start_time, end_time, 
-                duration, session_type, exam_type, instructions, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+            query = _SQL_EXAM_INSERT
             params = (self.subject_code, self.exam_date, self.start_time, 
                      self.end_time, self.duration, self.session_type, self.exam_type,
                      self.instructions, self.is_active)
             
-            # Execute insert and get the ID
-            conn = db_manager.get_connection()
-            try:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                self.id = cursor.lastrowid
-                conn.commit()
-                return cursor.rowcount
-            except Exception as e:
-                conn.rollback()
-                raise e
-            finally:
-                conn.close()
+            # Insert and read the new ID back from the same statement
+            with db_manager.transaction() as conn:
+                cursor = conn.execute(query, params)
+                self.id = cursor.fetchone()[0]
+            return cursor.rowcount
     
     def delete(self):
         """Soft delete exam"""
-        query = 'UPDATE exams SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE id=?'
+        query = _SQL_EXAM_SOFT_DELETE
         return db_manager.execute_query(query, (self.id,))
     
     def get_enrolled_students(self):
         """Get students enrolled for this exam"""
-        query = '''
-            SELECT s.* FROM students s
-            JOIN student_subjects ss ON s.student_id = ss.student_id
-            WHERE ss.subject_code = ? AND ss.is_active = 1 AND s.is_active = 1
-        '''
+        query = _SQL_EXAM_ENROLLED_STUDENTS
         return db_manager.execute_query(query, (self.subject_code,))
     
     @classmethod
     def get_by_id(cls, exam_id):
         """Get exam by ID"""
-        query = 'SELECT * FROM exams WHERE id = ? AND is_active = 1'
-        result = db_manager.execute_query(query, (exam_id,), fetch_one=True)
-        return cls(**dict(result)) if result else None
+        query = _SQL_EXAM_GET
+        result = db_manager.execute_query(query, (exam_id,), fetch_one=True, cached=True)
+        return cls._from_row(result) if result else None
     
     @classmethod
-    def get_all(cls, date_from=None, date_to=None, subject_code=None):
+    def get_all(cls, date_from=None, date_to=None, subject_code=None, page_size=None):
         """Get all exams with optional filters"""
-        query = 'SELECT * FROM exams WHERE is_active = 1'
-        params = []
-        
-        if date_from:
-            query += ' AND exam_date >= ?'
-            params.append(date_from)
-        
-        if date_to:
-            query += ' AND exam_date <= ?'
-            params.append(date_to)
-        
-        if subject_code:
-            query += ' AND subject_code = ?'
-            params.append(subject_code)
-        
-        query += ' ORDER BY exam_date, start_time'
-        results = db_manager.execute_query(query, params)
-        return [cls(**dict(row)) for row in results]
+        return cls._select_active((
+            ('exam_date >= ?', date_from or None),
+            ('exam_date <= ?', date_to or None),
+            ('subject_code = ?', subject_code or None),
+        ), 'exam_date, start_time', page_size=page_size)
+
+# SQL statements used by Invigilator
+_SQL_INVIGILATOR_UPDATE = '''
+    UPDATE invigilators SET name=?, email=?, phone=?, department=?, 
+    designation=?, experience=?, max_assignments=?, preferences=?, 
+    availability=?, is_active=?, updated_at=CURRENT_TIMESTAMP WHERE staff_id=?
+'''
+_SQL_INVIGILATOR_INSERT = '''
+    INSERT INTO invigilators (staff_id, name, email, phone, department, 
+    designation, experience, max_assignments, preferences, availability, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_INVIGILATOR_SOFT_DELETE = 'UPDATE invigilators SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE staff_id=?'
+_SQL_INVIGILATOR_GET = 'SELECT * FROM invigilators WHERE staff_id = ? AND is_active = 1'
 
 class Invigilator(BaseModel):
     """Invigilator model"""
     
+    __slots__ = ('id', 'staff_id', 'name', 'email', 'phone', 'department', 'designation',
+                 'experience', 'max_assignments', 'preferences', 'availability', 'is_active',
+                 'created_at', 'updated_at')
+    
+    table = 'invigilators'
+    insert_columns = ('staff_id', 'name', 'email', 'phone', 'department', 'designation',
+                      'experience', 'max_assignments', 'preferences', 'availability', 'is_active')
+    
     def __init__(self, staff_id=None, name=None, email=None, phone=None, 
                  department=None, designation=None, experience=0, max_assignments=2,
                  preferences=None, availability=None, is_active=True, **kwargs):
@@ -451,21 +742,13 @@ class Invigilator(BaseModel):
         """Save invigilator to database"""
         if hasattr(self, 'id') and self.id:
             # Update existing invigilator
-            query = '''
-                UPDATE invigilators SET name=?, email=?, phone=?, department=?, 
-                designation=?, experience=?, max_assignments=?, preferences=?, 
-                availability=?, is_active=?, updated_at=CURRENT_TIMESTAMP WHERE staff_id=?
-            '''
+            query = _SQL_INVIGILATOR_UPDATE
             params = (self.name, self.email, self.phone, self.department, 
                      self.designation, self.experience, self.max_assignments,
                      self.preferences, self.availability, self.is_active, self.staff_id)
         else:
             # Insert new invigilator
-            query = '''
-                INSERT INTO invigilators (staff_id, name, email, phone, department, 
-                designation, experience, max_assignments, preferences, availability, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+            query = _SQL_INVIGILATOR_INSERT
             params = (self.staff_id, self.name, self.email, self.phone, self.department,
                      self.designation, self.experience, self.max_assignments,
                      self.preferences, self.availability, self.is_active)
@@ -474,7 +757,7 @@ class Invigilator(BaseModel):
     
     def delete(self):
         """Soft delete invigilator"""
-        query = 'UPDATE invigilators SET is_active=0, updated_at=CURRENT_TIMESTAMP WHERE staff_id=?'
+        query = _SQL_INVIGILATOR_SOFT_DELETE
         return db_manager.execute_query(query, (self.staff_id,))
     
     def get_assignments(self, date_from=None, date_to=None):
@@ -502,24 +785,34 @@ class Invigilator(BaseModel):
     @classmethod
     def get_by_id(cls, staff_id):
         """Get invigilator by staff ID"""
-        query = 'SELECT * FROM invigilators WHERE staff_id = ? AND is_active = 1'
-        result = db_manager.execute_query(query, (staff_id,), fetch_one=True)
-        return cls(**dict(result)) if result else None
+        query = _SQL_INVIGILATOR_GET
+        result = db_manager.execute_query(query, (staff_id,), fetch_one=True, cached=True)
+        return cls._from_row(result) if result else None
     
     @classmethod
-    def get_all(cls, department=None, search=None):
+    def get_all(cls, department=None, search=None, page_size=None):
         """Get all invigilators with optional filters"""
-        query = 'SELECT * FROM invigilators WHERE is_active = 1'
-        params = []
-        
-        if department:
-            query += ' AND department = ?'
-            params.append(department)
-        
-        if search:
-            query += ' AND (name LIKE ? OR staff_id LIKE ?)'
-            params.extend([f'%{search}%', f'%{search}%'])
-        
-        query += ' ORDER BY name'
-        results = db_manager.execute_query(query, params)
-        return [cls(**dict(row)) for row in results]
\ No newline at end of file
+        return cls._select_active((
+            ('department = ?', department or None),
+            _search_filter('invigilators', search, ('name', 'staff_id')),
+        ), 'name', page_size=page_size)
+
+@lru_cache(maxsize=512)
+def _search_students(search, department, semester, limit, ttl_bucket):
+    """Cached student search; ttl_bucket expires entries after SEARCH_CACHE_TTL"""
+    return tuple({
+        'id': s.student_id,
+        'name': s.name,
+        'department': s.department,
+        'semester': s.semester
+    } for s in Student.get_all(department, semester, search, limit=limit))
+
+@lru_cache(maxsize=512)
+def _search_subjects(search, department, semester, limit, ttl_bucket):
+    """Cached subject search; ttl_bucket expires entries after SEARCH_CACHE_TTL"""
+    return tuple({
+        'code': s.subject_code,
+        'name': s.subject_name,
+        'department': s.department,
+        'semester': s.semester
+    } for s in Subject.get_all(department, semester, search, limit=limit))
@@ -5,38 +5,317 @@ import os
 import io
 import csv
 import json
+import itertools
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+from operator import itemgetter
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+# ReportLab's platypus/colors and openpyxl are imported by the functions that use them,
+# so importing the report generator (and the web app) does not pay for them up front
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
 from reportlab.lib.units import inch
-import pandas as pd
 from backend.database import db_manager
 
+# Characters Excel does not allow in sheet names, and its sheet name length limit
+EXCEL_SHEET_TRANS = str.maketrans({c: '_' for c in '/\\*?[]:'})
+EXCEL_SHEET_NAME_MAX = 31
+
+# Seating workbooks above this many rows skip openpyxl and are written as raw XML
+XLSX_RAW_XML_ROWS = 50000
+
+# Write buffer for streamed CSV reports
+CSV_WRITE_BUFFER = 1 << 20
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    """Paragraph and table styles shared by every PDF report, built on first use"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+    
+    sample = getSampleStyleSheet()
+    return {
+        'sample': sample,
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontSize=18,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        ),
+        'room_header': ParagraphStyle(
+            'RoomHeader',
+            parent=sample['Heading2'],
+            fontSize=14,
+            spaceAfter=10
+        ),
+        'seating_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        'util_summary': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER')
+        ]),
+        'util_detail': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        'duty_roster': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    }
+
+# Body frame of an A4 SimpleDocTemplate with its default one-inch margins
+PAGE_FRAME = (inch, inch, A4[0] - 2 * inch, A4[1] - 2 * inch)
+
+def _draw_pages(pdf, flowables):
+    """Lay flowables out on as many fresh pages as they need, splitting tables across pages"""
+    from reportlab.platypus import Frame
+    from reportlab.platypus.doctemplate import LayoutError
+    
+    while flowables:
+        frame = Frame(*PAGE_FRAME)
+        drawn = False
+        while flowables:
+            if frame.add(flowables[0], pdf, trySplit=1):
+                del flowables[0]
+                drawn = True
+                continue
+            parts = frame.split(flowables[0], pdf)
+            if parts:
+                frame.add(parts[0], pdf, trySplit=1)
+                flowables[0:1] = parts[1:]
+                drawn = True
+            elif not drawn:
+                raise LayoutError('Flowable too large for an empty page')
+            break
+        pdf.showPage()
+
+# Admit card layout on an A4 page, laid out once and reused for every card
+ADMIT_CARD_LABELS = (
+    '', 'Student ID:', 'Student Name:', 'Department:', 'Semester:', '',
+    'Subject Code:', 'Subject Name:', '', 'Exam Date:', 'Session Time:', '',
+    'Room:', 'Building:', 'Floor:', 'Seat Number:', '', 'Instructions:',
+    '1. Arrive 30 minutes before exam time', '2. Bring valid ID and this admit card',
+    '3. No electronic devices allowed', '4. Follow all examination rules'
+)
+ADMIT_CARD_LEFT = (A4[0] - 5 * inch) / 2
+ADMIT_CARD_SPLIT = ADMIT_CARD_LEFT + 2 * inch
+ADMIT_CARD_RIGHT = ADMIT_CARD_LEFT + 5 * inch
+ADMIT_CARD_TOP = A4[1] - inch
+ADMIT_CARD_TITLE_BOTTOM = ADMIT_CARD_TOP - 32
+ADMIT_CARD_ROW_HEIGHT = 18
+ADMIT_CARD_ROW_LINES = [ADMIT_CARD_TITLE_BOTTOM - i * ADMIT_CARD_ROW_HEIGHT
+                        for i in range(len(ADMIT_CARD_LABELS) + 1)]
+ADMIT_CARD_BOTTOM = ADMIT_CARD_ROW_LINES[-1]
+ADMIT_CARD_BASELINES = [y - ADMIT_CARD_ROW_HEIGHT + 5 for y in ADMIT_CARD_ROW_LINES[:-1]]
+
+def _write_file(filepath, data):
+    """Write a finished report in a single call and flush it to disk before returning"""
+    with open(filepath, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _write_xlsx(filepath, sheets, engine='openpyxl'):
+    """Stream (title, header, rows) sheets into a write-only workbook"""
+    if engine == 'rawxml':
+        return _write_xlsx_raw(filepath, sheets)
+    
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    
+    header_font = Font(bold=True)
+    workbook = Workbook(write_only=True)
+    for title, header, rows in sheets:
+        sheet = workbook.create_sheet(title)
+        header_cells = []
+        for name in header:
+            cell = WriteOnlyCell(sheet, value=name)
+            cell.font = header_font
+            header_cells.append(cell)
+        sheet.append(header_cells)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(filepath)
+
+_XLSX_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_XLSX_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_XLSX_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_XLSX_STYLES = (
+    _XLSX_XML_DECL +
+    f'<styleSheet xmlns="{_XLSX_MAIN_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+def _xlsx_cell(value, style=''):
+    """Render one cell; cells carry no reference so they are placed in document order"""
+    if value is None:
+        return f'<c{style}/>'
+    if isinstance(value, bool):
+        return f'<c{style} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c{style}><v>{value}</v></c>'
+    return f'<c{style} t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+def _write_xlsx_raw(filepath, sheets):
+    """Write (title, header, rows) sheets as a minimal XLSX package without openpyxl"""
+    titles = []
+    with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as package:
+        for number, (title, header, rows) in enumerate(sheets, 1):
+            titles.append(title)
+            with package.open(f'xl/worksheets/sheet{number}.xml', 'w') as raw, \
+                    io.TextIOWrapper(raw, encoding='utf-8') as out:
+                out.write(f'{_XLSX_XML_DECL}<worksheet xmlns="{_XLSX_MAIN_NS}"><sheetData>')
+                out.write('<row>' + ''.join(_xlsx_cell(name, ' s="1"') for name in header) + '</row>')
+                for row in rows:
+                    out.write('<row>' + ''.join(map(_xlsx_cell, row)) + '</row>')
+                out.write('</sheetData></worksheet>')
+        
+        count = len(titles)
+        package.writestr('[Content_Types].xml', (
+            _XLSX_XML_DECL +
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + ''.join(f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for n in range(1, count + 1)) +
+            '</Types>'
+        ))
+        package.writestr('_rels/.rels', (
+            _XLSX_XML_DECL +
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ))
+        package.writestr('xl/workbook.xml', (
+            _XLSX_XML_DECL +
+            f'<workbook xmlns="{_XLSX_MAIN_NS}" xmlns:r="{_XLSX_REL_NS}"><sheets>'
+            + ''.join(f'<sheet name={quoteattr(title)} sheetId="{n}" r:id="rId{n}"/>'
+                      for n, title in enumerate(titles, 1)) +
+            '</sheets></workbook>'
+        ))
+        package.writestr('xl/_rels/workbook.xml.rels', (
+            _XLSX_XML_DECL +
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(f'<Relationship Id="rId{n}" Type="{_XLSX_REL_NS}/worksheet" '
+                      f'Target="worksheets/sheet{n}.xml"/>' for n in range(1, count + 1)) +
+            f'<Relationship Id="rId{count + 1}" Type="{_XLSX_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        package.writestr('xl/styles.xml', _XLSX_STYLES)
+
+# Column order of the tuples returned by _fetch_seating()
+_SQL_SEATING = '''
+    SELECT r.name as room_name, COALESCE(NULLIF(r.building, ''), 'N/A') as building,
+           COALESCE(NULLIF(r.floor, 0), 'N/A') as floor, sa.seat_row, sa.seat_col,
+           sa.student_id, s.name as student_name, s.department, s.semester,
+           sa.subject_code, sub.subject_name
+    FROM seating_arrangements sa
+    JOIN students s ON s.id = sa.student_pk
+    JOIN subjects sub ON sub.id = sa.subject_pk
+    JOIN rooms r ON r.id = sa.room_pk
+    WHERE sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
+    ORDER BY r.name, sa.seat_row, sa.seat_col
+'''
+
+def _fetch_seating(exam_date, session_time):
+    """Seating rows for one session, shared by every report format and the admit cards"""
+    # Read fresh: seating can be rewritten by connections the query cache never hears about
+    return db_manager.query(_SQL_SEATING, (exam_date, session_time), tuples=True)
+
+_SQL_ROOM_UTILIZATION = '''
+    WITH per_session AS (
+        SELECT room_id, exam_date, session_time, COUNT(*) AS allocated
+        FROM seating_arrangements
+        WHERE is_active = 1 {date_filter}
+        GROUP BY room_id, exam_date, session_time
+    )
+    SELECT r.room_id, r.name as room_name, r.capacity,
+           COALESCE(NULLIF(r.building, ''), 'N/A') as building,
+           COALESCE(NULLIF(r.floor, 0), 'N/A') as floor,
+           COALESCE(SUM(ps.allocated), 0) as total_allocations,
+           COUNT(ps.exam_date) as sessions_used,
+           COALESCE(ROUND(AVG(ps.allocated * 100.0 / r.capacity), 2), 0) as avg_occupancy
+    FROM rooms r
+    LEFT JOIN per_session ps ON ps.room_id = r.room_id
+    WHERE r.is_active = 1
+    GROUP BY r.id
+    ORDER BY total_allocations DESC
+'''
+
+_SQL_DUTY_ROSTER = '''
+    SELECT ia.*, i.name as invigilator_name,
+           COALESCE(NULLIF(i.department, ''), 'N/A') as department,
+           COALESCE(NULLIF(i.phone, ''), 'N/A') as phone,
+           r.name as room_name, COALESCE(NULLIF(r.building, ''), 'N/A') as building, s.subject_name
+    FROM invigilator_assignments ia
+    JOIN invigilators i ON ia.staff_id = i.staff_id
+    JOIN rooms r ON ia.room_id = r.room_id
+    JOIN subjects s ON ia.subject_code = s.subject_code
+    WHERE ia.is_active = 1 {date_filter}
+    ORDER BY ia.exam_date, ia.session_time, i.name
+'''
+
 class ReportGenerator:
     """Generate various reports for the examination system"""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet()
         self.reports_dir = 'reports'
         os.makedirs(self.reports_dir, exist_ok=True)
     
+    @property
+    def styles(self):
+        """ReportLab sample stylesheet"""
+        return _pdf_styles()['sample']
+    
     def generate_seating_arrangement_report(self, exam_date, session_time, format='pdf'):
         """Generate seating arrangement report"""
         try:
-            # Get seating data
-            query = '''
-                SELECT sa.*, s.name as student_name, s.department, s.semester,
-                       sub.subject_name, r.name as room_name, r.building, r.floor
-                FROM seating_arrangements sa
-                JOIN students s ON sa.student_id = s.student_id
-                JOIN subjects sub ON sa.subject_code = sub.subject_code
-                JOIN rooms r ON sa.room_id = r.room_id
-                WHERE sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
-                ORDER BY r.name, sa.seat_row, sa.seat_col
-            '''
-            data = db_manager.execute_query(query, (exam_date, session_time))
+            data = _fetch_seating(exam_date, session_time)
             
             if not data:
                 return {'success': False, 'message': 'No seating arrangements found'}
@@ -53,82 +332,78 @@ class ReportGenerator:
         except Exception as e:
             return {'success': False, 'message': f'Error generating report: {str(e)}'}
     
+    def generate_seating_all(self, exam_date, session_time):
+        """Generate the seating arrangement report in every format from a single fetch"""
+        try:
+            data = _fetch_seating(exam_date, session_time)
+            
+            if not data:
+                return {'success': False, 'message': 'No seating arrangements found'}
+            
+            # The writers share the fetched rows read-only and spend most of their time in file I/O
+            writers = {
+                'pdf': self._generate_seating_pdf,
+                'excel': self._generate_seating_excel,
+                'csv': self._generate_seating_csv
+            }
+            with ThreadPoolExecutor(len(writers)) as executor:
+                futures = {fmt: executor.submit(writer, data, exam_date, session_time)
+                           for fmt, writer in writers.items()}
+                reports = {fmt: future.result() for fmt, future in futures.items()}
+            
+            return {
+                'success': True,
+                'reports': reports,
+                'message': 'PDF, Excel and CSV reports generated successfully'
+            }
+            
+        except Exception as e:
+            return {'success': False, 'message': f'Error generating report: {str(e)}'}
+    
     def _generate_seating_pdf(self, data, exam_date, session_time):
         """Generate PDF seating arrangement report"""
         filename = f'seating_arrangement_{exam_date}_{session_time.replace(":", "")}.pdf'
         filepath = os.path.join(self.reports_dir, filename)
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        # Each room is laid out and drawn on its own pages before the next is built
+        from reportlab.pdfgen import canvas
+        from reportlab.platypus import Table, Paragraph, Spacer
+        
+        styles = _pdf_styles()
+        pdf = canvas.Canvas(io.BytesIO(), pagesize=A4)
         story = []
         
         # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        story.append(Paragraph(f'Seating Arrangement Report', title_style))
+        story.append(Paragraph(f'Seating Arrangement Report', styles['title']))
         story.append(Paragraph(f'Date: {exam_date} | Session: {session_time}', self.styles['Normal']))
         story.append(Spacer(1, 20))
         
-        # Group by room
-        rooms = {}
-        for row in data:
-            room_name = row['room_name']
-            if room_name not in rooms:
-                rooms[room_name] = []
-            rooms[room_name].append(dict(row))
-        
-        # Generate room-wise reports
-        for room_name, room_data in rooms.items():
-            # Room header
-            room_style = ParagraphStyle(
-                'RoomHeader',
-                parent=self.styles['Heading2'],
-                fontSize=14,
-                spaceAfter=10
-            )
-            story.append(Paragraph(f'Room: {room_name}', room_style))
+        # Rows arrive ordered by room, seat row and seat column, so each room is one run
+        for room_name, room_rows in itertools.groupby(data, key=itemgetter(0)):
+            room_rows = list(room_rows)
+            story.append(Paragraph(f'Room: {room_name}', styles['room_header']))
             
             # Room statistics
-            building = room_data[0]['building'] if room_data[0]['building'] else 'N/A'
-            floor = room_data[0]['floor'] if room_data[0]['floor'] else 'N/A'
-            story.append(Paragraph(f'Building: {building} | Floor: {floor} | Students: {len(room_data)}', 
+            building = room_rows[0][1]
+            floor = room_rows[0][2]
+            story.append(Paragraph(f'Building: {building} | Floor: {floor} | Students: {len(room_rows)}', 
                                  self.styles['Normal']))
             story.append(Spacer(1, 10))
             
-            # Create table data
             table_data = [['Seat', 'Student ID', 'Student Name', 'Department', 'Subject']]
-            for student in sorted(room_data, key=lambda x: (x['seat_row'], x['seat_col'])):
-                table_data.append([
-                    f"{student['seat_row']}-{student['seat_col']}",
-                    student['student_id'],
-                    student['student_name'],
-                    student['department'],
-                    student['subject_code']
-                ])
+            table_data.extend(
+                [f"{seat_row}-{seat_col}", student_id, student_name, department, subject_code]
+                for _, _, _, seat_row, seat_col, student_id, student_name, department, _, subject_code, _
+                in room_rows
+            )
             
-            # Create table
             table = Table(table_data, colWidths=[1*inch, 1.5*inch, 2*inch, 1.5*inch, 1*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            table.setStyle(styles['seating_table'])
             
             story.append(table)
-            story.append(PageBreak())
+            _draw_pages(pdf, story)
         
-        # Build PDF
-        doc.build(story)
+        _write_file(filepath, pdf.getpdfdata())
         
         return {
             'success': True,
@@ -142,42 +417,51 @@ class ReportGenerator:
         filename = f'seating_arrangement_{exam_date}_{session_time.replace(":", "")}.xlsx'
         filepath = os.path.join(self.reports_dir, filename)
         
-        # Convert to DataFrame
-        df_data = []
-        for row in data:
-            df_data.append({
-                'Room': row['room_name'],
-                'Building': row['building'] or 'N/A',
-                'Floor': row['floor'] or 'N/A',
-                'Seat Position': f"{row['seat_row']}-{row['seat_col']}",
-                'Student ID': row['student_id'],
-                'Student Name': row['student_name'],
-                'Department': row['department'],
-                'Semester': row['semester'],
-                'Subject Code': row['subject_code'],
-                'Subject Name': row['subject_name']
-            })
-        
-        df = pd.DataFrame(df_data)
-        
-        # Create Excel writer
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Summary sheet
-            summary_data = {
-                'Metric': ['Total Students', 'Total Rooms', 'Exam Date', 'Session Time'],
-                'Value': [len(data), len(set(row['room_name'] for row in data)), exam_date, session_time]
-            }
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Main data sheet
-            df.to_excel(writer, sheet_name='Seating Arrangement', index=False)
-            
-            # Room-wise sheets
-            for room_name in df['Room'].unique():
-                room_df = df[df['Room'] == room_name].copy()
-                safe_room_name = room_name.replace('/', '_').replace('\\', '_')[:31]  # Excel sheet name limit
-                room_df.to_excel(writer, sheet_name=safe_room_name, index=False)
+        header = ('Room', 'Building', 'Floor', 'Seat Position', 'Student ID', 'Student Name',
+                  'Department', 'Semester', 'Subject Code', 'Subject Name')
+        
+        # Build the rows once and group them by room in the same pass
+        rows = []
+        rows_by_room = {}
+        for (room_name, building, floor, seat_row, seat_col, student_id, student_name,
+             department, semester, subject_code, subject_name) in data:
+            values = (
+                room_name,
+                building,
+                floor,
+                f"{seat_row}-{seat_col}",
+                student_id,
+                student_name,
+                department,
+                semester,
+                subject_code,
+                subject_name
+            )
+            rows.append(values)
+            rows_by_room.setdefault(room_name, []).append(values)
+        
+        summary = [
+            ('Total Students', len(data)),
+            ('Total Rooms', len(rows_by_room)),
+            ('Exam Date', exam_date),
+            ('Session Time', session_time)
+        ]
+        sheets = [('Summary', ('Metric', 'Value'), summary),
+                  ('Seating Arrangement', header, rows)]
+        
+        # Room-wise sheets; names must stay unique after escaping and truncation
+        seen = {title.lower() for title, _, _ in sheets}
+        for room_name, room_rows in rows_by_room.items():
+            safe_room_name = room_name.translate(EXCEL_SHEET_TRANS)[:EXCEL_SHEET_NAME_MAX]
+            suffix = 1
+            while safe_room_name.lower() in seen:
+                suffix += 1
+                tag = f'_{suffix}'
+                safe_room_name = room_name.translate(EXCEL_SHEET_TRANS)[:EXCEL_SHEET_NAME_MAX - len(tag)] + tag
+            seen.add(safe_room_name.lower())
+            sheets.append((safe_room_name, header, room_rows))
+        
+        _write_xlsx(filepath, sheets, engine='rawxml' if len(rows) > XLSX_RAW_XML_ROWS else 'openpyxl')
         
         return {
             'success': True,
@@ -191,25 +475,25 @@ class ReportGenerator:
         filename = f'seating_arrangement_{exam_date}_{session_time.replace(":", "")}.csv'
         filepath = os.path.join(self.reports_dir, filename)
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['room_name', 'building', 'floor', 'seat_position', 'student_id', 
-                         'student_name', 'department', 'semester', 'subject_code', 'subject_name']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for row in data:
-                writer.writerow({
-                    'room_name': row['room_name'],
-                    'building': row['building'] or 'N/A',
-                    'floor': row['floor'] or 'N/A',
-                    'seat_position': f"{row['seat_row']}-{row['seat_col']}",
-                    'student_id': row['student_id'],
-                    'student_name': row['student_name'],
-                    'department': row['department'],
-                    'semester': row['semester'],
-                    'subject_code': row['subject_code'],
-                    'subject_name': row['subject_name']
-                })
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(('room_name', 'building', 'floor', 'seat_position', 'student_id',
+                             'student_name', 'department', 'semester', 'subject_code', 'subject_name'))
+            writer.writerows((
+                room_name,
+                building,
+                floor,
+                f"{seat_row}-{seat_col}",
+                student_id,
+                student_name,
+                department,
+                semester,
+                subject_code,
+                subject_name
+            ) for (room_name, building, floor, seat_row, seat_col, student_id, student_name,
+                   department, semester, subject_code, subject_name) in data)
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
         
         return {
             'success': True,
@@ -221,18 +505,7 @@ class ReportGenerator:
     def generate_student_admit_cards(self, exam_date, session_time, format='pdf'):
         """Generate individual admit cards for students"""
         try:
-            # Get student seating data
-            query = '''
-                SELECT sa.*, s.name as student_name, s.department, s.semester, s.email,
-                       sub.subject_name, r.name as room_name, r.building, r.floor
-                FROM seating_arrangements sa
-                JOIN students s ON sa.student_id = s.student_id
-                JOIN subjects sub ON sa.subject_code = sub.subject_code
-                JOIN rooms r ON sa.room_id = r.room_id
-                WHERE sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
-                ORDER BY s.name
-            '''
-            data = db_manager.execute_query(query, (exam_date, session_time))
+            data = sorted(_fetch_seating(exam_date, session_time), key=itemgetter(6))
             
             if not data:
                 return {'success': False, 'message': 'No seating arrangements found'}
@@ -240,18 +513,13 @@ class ReportGenerator:
             filename = f'admit_cards_{exam_date}_{session_time.replace(":", "")}.pdf'
             filepath = os.path.join(self.reports_dir, filename)
             
-            doc = SimpleDocTemplate(filepath, pagesize=A4)
-            story = []
-            
-            for i, student in enumerate(data):
-                # Admit card for each student
-                story.append(self._create_admit_card(student, exam_date, session_time))
-                
-                # Add page break except for last student
-                if i < len(data) - 1:
-                    story.append(PageBreak())
+            from reportlab.pdfgen import canvas
             
-            doc.build(story)
+            pdf = canvas.Canvas(io.BytesIO(), pagesize=A4)
+            for student in data:
+                self._create_admit_card(pdf, student, exam_date, session_time)
+                pdf.showPage()
+            _write_file(filepath, pdf.getpdfdata())
             
             return {
                 'success': True,
@@ -263,83 +531,69 @@ class ReportGenerator:
         except Exception as e:
             return {'success': False, 'message': f'Error generating admit cards: {str(e)}'}
     
-    def _create_admit_card(self, student, exam_date, session_time):
-        """Create individual admit card"""
-        # Create a table for the admit card layout
-        card_data = [
-            ['EXAMINATION ADMIT CARD', ''],
-            ['', ''],
-            ['Student ID:', student['student_id']],
-            ['Student Name:', student['student_name']],
-            ['Department:', student['department']],
-            ['Semester:', str(student['semester'])],
-            ['', ''],
-            ['Subject Code:', student['subject_code']],
-            ['Subject Name:', student['subject_name']],
-            ['', ''],
-            ['Exam Date:', exam_date],
-            ['Session Time:', session_time],
-            ['', ''],
-            ['Room:', student['room_name']],
-            ['Building:', student['building'] or 'N/A'],
-            ['Floor:', str(student['floor']) if student['floor'] else 'N/A'],
-            ['Seat Number:', f"{student['seat_row']}-{student['seat_col']}"],
-            ['', ''],
-            ['Instructions:', ''],
-            ['1. Arrive 30 minutes before exam time', ''],
-            ['2. Bring valid ID and this admit card', ''],
-            ['3. No electronic devices allowed', ''],
-            ['4. Follow all examination rules', '']
-        ]
-        
-        table = Table(card_data, colWidths=[2*inch, 3*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('SPAN', (0, 0), (1, 0)),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('FONTNAME', (0, 2), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP')
-        ]))
+    def _create_admit_card(self, pdf, student, exam_date, session_time):
+        """Draw an individual admit card on the current page"""
+        from reportlab.lib import colors
+        
+        (room_name, building, floor, seat_row, seat_col, student_id, student_name,
+         department, semester, subject_code, subject_name) = student
+        values = (
+            '',
+            student_id,
+            student_name,
+            department,
+            str(semester),
+            '',
+            subject_code,
+            subject_name,
+            '',
+            exam_date,
+            session_time,
+            '',
+            room_name,
+            building,
+            str(floor),
+            f"{seat_row}-{seat_col}",
+            '', '', '', '', '', ''
+        )
         
-        return table
+        # Title banner
+        pdf.setFillColor(colors.darkblue)
+        pdf.rect(ADMIT_CARD_LEFT, ADMIT_CARD_TITLE_BOTTOM, ADMIT_CARD_RIGHT - ADMIT_CARD_LEFT,
+                 ADMIT_CARD_TOP - ADMIT_CARD_TITLE_BOTTOM, stroke=0, fill=1)
+        pdf.setFillColor(colors.whitesmoke)
+        pdf.setFont('Helvetica-Bold', 14)
+        pdf.drawCentredString((ADMIT_CARD_LEFT + ADMIT_CARD_RIGHT) / 2, ADMIT_CARD_TITLE_BOTTOM + 12,
+                              'EXAMINATION ADMIT CARD')
+        
+        # Labels and values
+        pdf.setFillColor(colors.black)
+        pdf.setFont('Helvetica-Bold', 10)
+        for label, y in zip(ADMIT_CARD_LABELS, ADMIT_CARD_BASELINES):
+            if label:
+                pdf.drawString(ADMIT_CARD_LEFT + 6, y, label)
+        pdf.setFont('Helvetica', 10)
+        for value, y in zip(values, ADMIT_CARD_BASELINES):
+            if value:
+                pdf.drawString(ADMIT_CARD_SPLIT + 6, y, str(value))
+        
+        # Grid
+        pdf.setStrokeColor(colors.black)
+        pdf.setLineWidth(1)
+        pdf.rect(ADMIT_CARD_LEFT, ADMIT_CARD_BOTTOM, ADMIT_CARD_RIGHT - ADMIT_CARD_LEFT,
+                 ADMIT_CARD_TOP - ADMIT_CARD_BOTTOM)
+        pdf.lines([(ADMIT_CARD_LEFT, y, ADMIT_CARD_RIGHT, y) for y in ADMIT_CARD_ROW_LINES[:-1]]
+                  + [(ADMIT_CARD_SPLIT, ADMIT_CARD_TITLE_BOTTOM, ADMIT_CARD_SPLIT, ADMIT_CARD_BOTTOM)])
     
     def generate_room_utilization_report(self, date_from=None, date_to=None, format='pdf'):
         """Generate room utilization report"""
         try:
-            # Build query based on date range
+            # Occupancy is averaged over the sessions each room was used in
             if date_from and date_to:
-                query = '''
-                    SELECT r.room_id, r.name as room_name, r.capacity, r.building, r.floor,
-                           COUNT(sa.id) as total_allocations,
-                           COUNT(DISTINCT sa.exam_date || sa.session_time) as sessions_used,
-                           ROUND(AVG(CAST(COUNT(sa.id) AS FLOAT) / r.capacity * 100), 2) as avg_occupancy
-                    FROM rooms r
-                    LEFT JOIN seating_arrangements sa ON r.room_id = sa.room_id 
-                        AND sa.exam_date BETWEEN ? AND ? AND sa.is_active = 1
-                    WHERE r.is_active = 1
-                    GROUP BY r.room_id, r.name, r.capacity, r.building, r.floor
-                    ORDER BY total_allocations DESC
-                '''
-                data = db_manager.execute_query(query, (date_from, date_to))
+                query = _SQL_ROOM_UTILIZATION.format(date_filter='AND exam_date BETWEEN ? AND ?')
+                data = db_manager.query(query, (date_from, date_to))
             else:
-                query = '''
-                    SELECT r.room_id, r.name as room_name, r.capacity, r.building, r.floor,
-                           COUNT(sa.id) as total_allocations,
-                           COUNT(DISTINCT sa.exam_date || sa.session_time) as sessions_used,
-                           ROUND(AVG(CAST(COUNT(sa.id) AS FLOAT) / r.capacity * 100), 2) as avg_occupancy
-                    FROM rooms r
-                    LEFT JOIN seating_arrangements sa ON r.room_id = sa.room_id AND sa.is_active = 1
-                    WHERE r.is_active = 1
-                    GROUP BY r.room_id, r.name, r.capacity, r.building, r.floor
-                    ORDER BY total_allocations DESC
-                '''
-                data = db_manager.execute_query(query)
+                data = db_manager.query(_SQL_ROOM_UTILIZATION.format(date_filter=''))
             
             if format.lower() == 'pdf':
                 return self._generate_utilization_pdf(data, date_from, date_to)
@@ -357,18 +611,15 @@ class ReportGenerator:
         filename = f'room_utilization_{date_range}.pdf'
         filepath = os.path.join(self.reports_dir, filename)
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+        
+        styles = _pdf_styles()
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
         story = []
         
         # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1
-        )
-        story.append(Paragraph('Room Utilization Report', title_style))
+        story.append(Paragraph('Room Utilization Report', styles['title']))
         
         if date_from and date_to:
             story.append(Paragraph(f'Period: {date_from} to {date_to}', self.styles['Normal']))
@@ -377,10 +628,25 @@ class ReportGenerator:
         
         story.append(Spacer(1, 20))
         
-        # Summary statistics
+        # Detail rows and summary totals in a single pass
+        table_data = [['Room', 'Building', 'Capacity', 'Allocations', 'Sessions', 'Avg Occupancy']]
+        total_allocations = 0
+        total_occupancy = 0
+        for row in data:
+            occupancy = row['avg_occupancy']
+            total_allocations += row['total_allocations']
+            total_occupancy += occupancy
+            table_data.append([
+                row['room_name'],
+                row['building'],
+                str(row['capacity']),
+                str(row['total_allocations']),
+                str(row['sessions_used']),
+                f"{occupancy:.1f}%"
+            ])
+        
         total_rooms = len(data)
-        total_allocations = sum(row['total_allocations'] for row in data)
-        avg_utilization = sum(row['avg_occupancy'] or 0 for row in data) / total_rooms if total_rooms > 0 else 0
+        avg_utilization = total_occupancy / total_rooms if total_rooms > 0 else 0
         
         summary_data = [
             ['Total Rooms', str(total_rooms)],
@@ -389,44 +655,17 @@ class ReportGenerator:
         ]
         
         summary_table = Table(summary_data, colWidths=[2*inch, 1*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER')
-        ]))
+        summary_table.setStyle(styles['util_summary'])
         
         story.append(summary_table)
         story.append(Spacer(1, 20))
         
-        # Detailed table
-        table_data = [['Room', 'Building', 'Capacity', 'Allocations', 'Sessions', 'Avg Occupancy']]
-        for row in data:
-            table_data.append([
-                row['room_name'],
-                row['building'] or 'N/A',
-                str(row['capacity']),
-                str(row['total_allocations']),
-                str(row['sessions_used']),
-                f"{row['avg_occupancy'] or 0:.1f}%"
-            ])
-        
         detail_table = Table(table_data, colWidths=[1.5*inch, 1*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch])
-        detail_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        detail_table.setStyle(styles['util_detail'])
         
         story.append(detail_table)
         doc.build(story)
+        _write_file(filepath, buffer.getbuffer())
         
         return {
             'success': True,
@@ -441,24 +680,20 @@ class ReportGenerator:
         filename = f'room_utilization_{date_range}.xlsx'
         filepath = os.path.join(self.reports_dir, filename)
         
-        # Convert to DataFrame
-        df_data = []
-        for row in data:
-            df_data.append({
-                'Room ID': row['room_id'],
-                'Room Name': row['room_name'],
-                'Building': row['building'] or 'N/A',
-                'Floor': row['floor'] or 'N/A',
-                'Capacity': row['capacity'],
-                'Total Allocations': row['total_allocations'],
-                'Sessions Used': row['sessions_used'],
-                'Average Occupancy (%)': row['avg_occupancy'] or 0
-            })
-        
-        df = pd.DataFrame(df_data)
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Room Utilization', index=False)
+        header = ('Room ID', 'Room Name', 'Building', 'Floor', 'Capacity', 'Total Allocations',
+                  'Sessions Used', 'Average Occupancy (%)')
+        rows = ((
+            row['room_id'],
+            row['room_name'],
+            row['building'],
+            row['floor'],
+            row['capacity'],
+            row['total_allocations'],
+            row['sessions_used'],
+            row['avg_occupancy']
+        ) for row in data)
+        
+        _write_xlsx(filepath, [('Room Utilization', header, rows)])
         
         return {
             'success': True,
@@ -470,31 +705,11 @@ class ReportGenerator:
     def generate_invigilator_duty_roster(self, date_from=None, date_to=None, format='pdf'):
         """Generate invigilator duty roster"""
         try:
-            # Build query
             if date_from and date_to:
-                query = '''
-                    SELECT ia.*, i.name as invigilator_name, i.department, i.phone,
-                           r.name as room_name, r.building, s.subject_name
-                    FROM invigilator_assignments ia
-                    JOIN invigilators i ON ia.staff_id = i.staff_id
-                    JOIN rooms r ON ia.room_id = r.room_id
-                    JOIN subjects s ON ia.subject_code = s.subject_code
-                    WHERE ia.exam_date BETWEEN ? AND ? AND ia.is_active = 1
-                    ORDER BY ia.exam_date, ia.session_time, i.name
-                '''
-                data = db_manager.execute_query(query, (date_from, date_to))
+                query = _SQL_DUTY_ROSTER.format(date_filter='AND ia.exam_date BETWEEN ? AND ?')
+                data = db_manager.query(query, (date_from, date_to))
             else:
-                query = '''
-                    SELECT ia.*, i.name as invigilator_name, i.department, i.phone,
-                           r.name as room_name, r.building, s.subject_name
-                    FROM invigilator_assignments ia
-                    JOIN invigilators i ON ia.staff_id = i.staff_id
-                    JOIN rooms r ON ia.room_id = r.room_id
-                    JOIN subjects s ON ia.subject_code = s.subject_code
-                    WHERE ia.is_active = 1
-                    ORDER BY ia.exam_date, ia.session_time, i.name
-                '''
-                data = db_manager.execute_query(query)
+                data = db_manager.query(_SQL_DUTY_ROSTER.format(date_filter=''))
             
             if not data:
                 return {'success': False, 'message': 'No invigilator assignments found'}
@@ -515,18 +730,15 @@ class ReportGenerator:
         filename = f'duty_roster_{date_range}.pdf'
         filepath = os.path.join(self.reports_dir, filename)
         
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+        
+        styles = _pdf_styles()
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
         story = []
         
         # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1
-        )
-        story.append(Paragraph('Invigilator Duty Roster', title_style))
+        story.append(Paragraph('Invigilator Duty Roster', styles['title']))
         
         if date_from and date_to:
             story.append(Paragraph(f'Period: {date_from} to {date_to}', self.styles['Normal']))
@@ -542,27 +754,18 @@ class ReportGenerator:
                 row['exam_date'],
                 row['session_time'],
                 row['invigilator_name'],
-                row['department'] or 'N/A',
+                row['department'],
                 row['room_name'],
                 row['subject_name'],
-                row['phone'] or 'N/A'
+                row['phone']
             ])
         
         table = Table(table_data, colWidths=[0.8*inch, 0.6*inch, 1.2*inch, 0.8*inch, 1*inch, 1.2*inch, 0.8*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(styles['duty_roster'])
         
         story.append(table)
         doc.build(story)
+        _write_file(filepath, buffer.getbuffer())
         
         return {
             'success': True,
@@ -577,26 +780,22 @@ class ReportGenerator:
         filename = f'duty_roster_{date_range}.xlsx'
         filepath = os.path.join(self.reports_dir, filename)
         
-        # Convert to DataFrame
-        df_data = []
-        for row in data:
-            df_data.append({
-                'Date': row['exam_date'],
-                'Session Time': row['session_time'],
-                'Staff ID': row['staff_id'],
-                'Invigilator Name': row['invigilator_name'],
-                'Department': row['department'] or 'N/A',
-                'Room': row['room_name'],
-                'Building': row['building'] or 'N/A',
-                'Subject': row['subject_name'],
-                'Contact': row['phone'] or 'N/A',
-                'Assignment Type': row['assignment_type']
-            })
-        
-        df = pd.DataFrame(df_data)
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Duty Roster', index=False)
+        header = ('Date', 'Session Time', 'Staff ID', 'Invigilator Name', 'Department', 'Room',
+                  'Building', 'Subject', 'Contact', 'Assignment Type')
+        rows = ((
+            row['exam_date'],
+            row['session_time'],
+            row['staff_id'],
+            row['invigilator_name'],
+            row['department'],
+            row['room_name'],
+            row['building'],
+            row['subject_name'],
+            row['phone'],
+            row['assignment_type']
+        ) for row in data)
+        
+        _write_xlsx(filepath, [('Duty Roster', header, rows)])
         
         return {
             'success': True,
@@ -1,13 +1,39 @@
 """
 Advanced Seating Arrangement Algorithm for Examination System
 """
-import random
 import math
 from collections import defaultdict
+from functools import lru_cache
+import numpy as np
 from backend.database import db_manager
-from backend.models import Student, Room, Exam, Subject
+from backend.models import Student, Room, Exam, Subject, IN_CLAUSE_CHUNK
 import uuid
 
+SEATING_COLUMNS = ('student_id', 'subject_code', 'room_id', 'seat_row', 'seat_col',
+                   'exam_date', 'session_time', 'student_pk', 'subject_pk', 'room_pk',
+                   'arrangement_id')
+
+# Student fields the allocator reads, in the column order of the students query
+STUDENT_FIELDS = ('id', 'student_id', 'name', 'department', 'semester',
+                  'subject_code', 'subject_dept', 'subject_name', 'subject_pk')
+
+ADJACENT = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+_rng = np.random.default_rng()
+
+def _shuffled(items):
+    """Items in random order, permuting indices instead of shuffling in place"""
+    return [items[i] for i in _rng.permutation(len(items)).tolist()]
+
+@lru_cache(maxsize=None)
+def _neighbours(rows, cols, diagonal):
+    """In-bounds neighbour seats of every seat in a flat, row-major rows x cols grid"""
+    directions = ADJACENT + DIAGONAL if diagonal else ADJACENT
+    return [tuple((row + dr) * cols + col + dc for dr, dc in directions
+                  if 0 <= row + dr < rows and 0 <= col + dc < cols)
+            for row in range(rows) for col in range(cols)]
+
 class SeatingAlgorithm:
     """Advanced seating arrangement algorithm with conflict resolution"""
     
@@ -65,10 +91,6 @@ class SeatingAlgorithm:
             if len(students) > total_capacity:
                 return {'success': False, 'message': f'Insufficient capacity. Need {len(students)} seats, available {total_capacity}'}
             
-            # Clear existing arrangements if not preserving
-            if not preserve_existing:
-                self._clear_existing_arrangements(exam_date, session_time)
-            
             # Apply arrangement strategy
             arrangement_strategy = self.arrangement_strategies.get(arrangement_type, self._mixed_arrangement)
             arranged_students = arrangement_strategy(students)
@@ -76,16 +98,24 @@ class SeatingAlgorithm:
             # Apply conflict avoidance strategy
             conflict_strategy = self.conflict_strategies.get(conflict_avoidance, self._strict_conflict_check)
             
-            # Perform seating allocation
-            allocation_result = self._allocate_seats(
-                arranged_students, rooms, exam_date, session_time, conflict_strategy
-            )
-            
             # Generate arrangement ID for tracking
             arrangement_id = str(uuid.uuid4())
             
-            # Update arrangement records with ID
-            self._update_arrangement_id(exam_date, session_time, arrangement_id)
+            # Clear, allocate and tag the session in a single transaction
+            with db_manager.transaction():
+                # Clear existing arrangements if not preserving
+                if not preserve_existing:
+                    self._clear_existing_arrangements(exam_date, session_time)
+                
+                # Perform seating allocation
+                allocation_result = self._allocate_seats(
+                    arranged_students, rooms, exam_date, session_time, conflict_strategy,
+                    arrangement_id
+                )
+                
+                # New seats are inserted with the ID; preserved ones are re-tagged
+                if preserve_existing:
+                    self._update_arrangement_id(exam_date, session_time, arrangement_id)
             
             return {
                 'success': True,
@@ -108,53 +138,58 @@ class SeatingAlgorithm:
             JOIN subjects s ON e.subject_code = s.subject_code 
             WHERE e.exam_date = ? AND e.start_time = ? AND e.is_active = 1
         '''
-        return db_manager.execute_query(query, (exam_date, session_time))
+        return db_manager.query(query, (exam_date, session_time))
     
     def _get_students_for_exams(self, exams):
         """Get students enrolled for the exams"""
-        students = []
-        for exam in exams:
-            query = '''
-                SELECT s.*, ss.subject_code, sub.department as subject_dept, sub.subject_name
+        codes = list(dict.fromkeys(exam['subject_code'] for exam in exams))
+        by_subject = {code: [] for code in codes}
+        for start in range(0, len(codes), IN_CLAUSE_CHUNK):
+            chunk = codes[start:start + IN_CLAUSE_CHUNK]
+            query = f'''
+                SELECT s.id, s.student_id, s.name, s.department, s.semester,
+                       ss.subject_code, sub.department as subject_dept, sub.subject_name,
+                       sub.id as subject_pk
                 FROM students s
                 JOIN student_subjects ss ON s.student_id = ss.student_id
                 JOIN subjects sub ON ss.subject_code = sub.subject_code
-                WHERE ss.subject_code = ? AND ss.is_active = 1 AND s.is_active = 1
+                WHERE ss.subject_code IN ({', '.join('?' * len(chunk))}) 
+                AND ss.is_active = 1 AND s.is_active = 1
             '''
-            exam_students = db_manager.execute_query(query, (exam['subject_code'],))
-            students.extend([dict(student) for student in exam_students])
+            for student in db_manager.query(query, chunk, tuples=True):
+                by_subject[student[5]].append(student)
+        
+        # Keep the per-exam order of the original one-query-per-exam loop
+        students = []
+        for exam in exams:
+            students.extend([dict(zip(STUDENT_FIELDS, student))
+                             for student in by_subject[exam['subject_code']]])
         
         return students
     
     def _get_available_rooms(self, exam_date, session_time, utilization_strategy):
         """Get available rooms based on utilization strategy"""
-        query = 'SELECT * FROM rooms WHERE is_active = 1'
-        
         if utilization_strategy == 'optimal':
-            query += ' ORDER BY capacity DESC'
+            rooms = 'SELECT * FROM rooms WHERE is_active = 1'
+            order = ' ORDER BY capacity DESC'
         elif utilization_strategy == 'balanced':
-            query += ' ORDER BY capacity ASC'
-        else:  # minimal
-            query += ' ORDER BY capacity DESC LIMIT 5'
-        
-        rooms = db_manager.execute_query(query)
+            rooms = 'SELECT * FROM rooms WHERE is_active = 1'
+            order = ' ORDER BY capacity ASC'
+        else:  # minimal: the five largest rooms, minus any already in use
+            rooms = 'SELECT * FROM rooms WHERE is_active = 1 ORDER BY capacity DESC LIMIT 5'
+            order = ' ORDER BY capacity DESC'
         
-        # Filter out rooms that are already occupied
-        available_rooms = []
-        for room in rooms:
-            if self._is_room_available(room['room_id'], exam_date, session_time):
-                available_rooms.append(dict(room))
+        # Drop rooms that are already occupied in the same query
+        query = f'''
+            SELECT r.* FROM ({rooms}) r
+            WHERE NOT EXISTS (
+                SELECT 1 FROM seating_arrangements sa
+                WHERE sa.room_id = r.room_id AND sa.exam_date = ? AND sa.session_time = ?
+                AND sa.is_active = 1
+            )
+        ''' + order
         
-        return available_rooms
-    
-    def _is_room_available(self, room_id, exam_date, session_time):
-        """Check if room is available for the session"""
-        query = '''
-            SELECT COUNT(*) FROM seating_arrangements 
-            WHERE room_id = ? AND exam_date = ? AND session_time = ? AND is_active = 1
-        '''
-        result = db_manager.execute_query(query, (room_id, exam_date, session_time), fetch_one=True)
-        return result[0] == 0
+        return [dict(room) for room in db_manager.query(query, (exam_date, session_time))]
     
     def _clear_existing_arrangements(self, exam_date, session_time):
         """Clear existing seating arrangements for the session"""
@@ -167,9 +202,7 @@ class SeatingAlgorithm:
     
     def _mixed_arrangement(self, students):
         """Mixed arrangement strategy - shuffle students randomly"""
-        shuffled = students.copy()
-        random.shuffle(shuffled)
-        return shuffled
+        return _shuffled(students)
     
     def _department_wise_arrangement(self, students):
         """Department-wise arrangement strategy"""
@@ -180,9 +213,8 @@ class SeatingAlgorithm:
         
         # Shuffle within departments and combine
         arranged = []
-        for dept, dept_students in dept_groups.items():
-            random.shuffle(dept_students)
-            arranged.extend(dept_students)
+        for dept_students in dept_groups.values():
+            arranged.extend(_shuffled(dept_students))
         
         return arranged
     
@@ -194,18 +226,22 @@ class SeatingAlgorithm:
         """Alphabetical arrangement strategy"""
         return sorted(students, key=lambda x: x['name'])
     
-    def _allocate_seats(self, students, rooms, exam_date, session_time, conflict_strategy):
+    def _allocate_seats(self, students, rooms, exam_date, session_time, conflict_strategy,
+                        arrangement_id=None):
         """Allocate seats to students"""
         allocated_count = 0
         failed_students = []
         rooms_used = set()
         conflicts_resolved = 0
+        seating_records = []
         
-        # Initialize room grids
+        # Initialize room grids as flat row-major seat lists, with their empty seats
         room_grids = {}
         for room in rooms:
+            seats = room['rows'] * room['cols']
             room_grids[room['room_id']] = {
-                'grid': [[None for _ in range(room['cols'])] for _ in range(room['rows'])],
+                'grid': [None] * seats,
+                'free': list(range(seats)),
                 'room_info': room
             }
         
@@ -214,40 +250,46 @@ class SeatingAlgorithm:
             allocated = False
             
             for room_id, room_data in room_grids.items():
-                if allocated:
-                    break
-                
                 grid = room_data['grid']
+                free = room_data['free']
                 room_info = room_data['room_info']
+                cols = room_info['cols']
                 
-                # Try to find a suitable seat
-                for row in range(room_info['rows']):
-                    if allocated:
-                        break
+                # Try to find a suitable seat; occupied seats are never revisited
+                for index, seat in enumerate(free):
+                    # Check for conflicts
+                    if conflict_strategy(student, grid, cols, seat):
+                        conflicts_resolved += 1
+                        continue
+                    
+                    # Allocate seat
+                    grid[seat] = student
+                    del free[index]
+                    row, col = divmod(seat, cols)
+                    
+                    seating_records.append((
+                        student['student_id'], student['subject_code'], room_id,
+                        row + 1, col + 1, exam_date, session_time,
+                        student['id'], student['subject_pk'], room_info['id'],
+                        arrangement_id
+                    ))
                     
-                    for col in range(room_info['cols']):
-                        if grid[row][col] is None:
-                            # Check for conflicts
-                            if conflict_strategy(student, grid, row, col):
-                                conflicts_resolved += 1
-                                continue
-                            
-                            # Allocate seat
-                            grid[row][col] = student
-                            
-                            # Insert into database
-                            self._insert_seating_record(
-                                student, room_id, row + 1, col + 1, 
-                                exam_date, session_time
-                            )
-                            
-                            allocated_count += 1
-                            rooms_used.add(room_id)
-                            allocated = True
-                            break
+                    allocated_count += 1
+                    rooms_used.add(room_id)
+                    allocated = True
+                    break
+                
+                if allocated:
+                    break
             
             if not allocated:
                 failed_students.append(student)
+            elif not free:
+                # A full room can never take another student; stop scanning it
+                del room_grids[room_id]
+        
+        # Insert all allocated seats in one transaction
+        db_manager.bulk_insert('seating_arrangements', SEATING_COLUMNS, seating_records)
         
         return {
             'allocated': allocated_count,
@@ -257,78 +299,51 @@ class SeatingAlgorithm:
             'conflicts_resolved': conflicts_resolved
         }
     
-    def _insert_seating_record(self, student, room_id, seat_row, seat_col, exam_date, session_time):
-        """Insert seating arrangement record"""
-        query = '''
-            INSERT INTO seating_arrangements 
-            (student_id, subject_code, room_id, seat_row, seat_col, exam_date, session_time)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        '''
-        params = (
-            student['student_id'], student['subject_code'], room_id,
-            seat_row, seat_col, exam_date, session_time
-        )
-        db_manager.execute_query(query, params)
-    
-    def _strict_conflict_check(self, student, grid, row, col):
+    def _strict_conflict_check(self, student, grid, cols, seat):
         """Strict conflict checking - no adjacent same department/subject"""
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+        department = student['department']
+        subject_code = student['subject_code']
         
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
+        for neighbour in _neighbours(len(grid) // cols, cols, True)[seat]:
+            adjacent_student = grid[neighbour]
             
-            if (0 <= new_row < len(grid) and 
-                0 <= new_col < len(grid[0]) and 
-                grid[new_row][new_col] is not None):
-                
-                adjacent_student = grid[new_row][new_col]
-                
-                # Check for conflicts
-                if (adjacent_student['department'] == student['department'] or
-                    adjacent_student['subject_code'] == student['subject_code']):
-                    return True
+            # Check for conflicts
+            if adjacent_student is not None and (
+                    adjacent_student['department'] == department or
+                    adjacent_student['subject_code'] == subject_code):
+                return True
         
         return False
     
-    def _moderate_conflict_check(self, student, grid, row, col):
+    def _moderate_conflict_check(self, student, grid, cols, seat):
         """Moderate conflict checking - 1 seat gap allowed"""
-        # Check immediate adjacent seats only
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        department = student['department']
+        subject_code = student['subject_code']
         
+        # Check immediate adjacent seats only
         conflicts = 0
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
+        for neighbour in _neighbours(len(grid) // cols, cols, False)[seat]:
+            adjacent_student = grid[neighbour]
             
-            if (0 <= new_row < len(grid) and 
-                0 <= new_col < len(grid[0]) and 
-                grid[new_row][new_col] is not None):
-                
-                adjacent_student = grid[new_row][new_col]
-                
-                if (adjacent_student['department'] == student['department'] or
-                    adjacent_student['subject_code'] == student['subject_code']):
-                    conflicts += 1
+            if adjacent_student is not None and (
+                    adjacent_student['department'] == department or
+                    adjacent_student['subject_code'] == subject_code):
+                conflicts += 1
         
         # Allow up to 1 conflict
         return conflicts > 1
     
-    def _relaxed_conflict_check(self, student, grid, row, col):
+    def _relaxed_conflict_check(self, student, grid, cols, seat):
         """Relaxed conflict checking - allow some conflicts"""
-        # Only check for same subject conflicts in immediate vicinity
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        subject_code = student['subject_code']
         
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
+        # Only check for same subject conflicts in immediate vicinity
+        for neighbour in _neighbours(len(grid) // cols, cols, False)[seat]:
+            adjacent_student = grid[neighbour]
             
-            if (0 <= new_row < len(grid) and 
-                0 <= new_col < len(grid[0]) and 
-                grid[new_row][new_col] is not None):
-                
-                adjacent_student = grid[new_row][new_col]
-                
-                # Only prevent same subject conflicts
-                if adjacent_student['subject_code'] == student['subject_code']:
-                    return True
+            # Only prevent same subject conflicts
+            if adjacent_student is not None and adjacent_student['subject_code'] == subject_code:
+                return True
         
         return False
     
@@ -343,35 +358,21 @@ class SeatingAlgorithm:
     
     def get_arrangement_statistics(self, exam_date, session_time):
         """Get statistics for a seating arrangement"""
-        # Total students
-        total_query = '''
-            SELECT COUNT(*) FROM seating_arrangements 
-            WHERE exam_date = ? AND session_time = ? AND is_active = 1
-        '''
-        total_students = db_manager.execute_query(total_query, (exam_date, session_time), fetch_one=True)[0]
-        
-        # Rooms used
-        rooms_query = '''
-            SELECT COUNT(DISTINCT room_id) FROM seating_arrangements 
-            WHERE exam_date = ? AND session_time = ? AND is_active = 1
+        # One pass over the session's seats, grouped per room; capacity is
+        # NULL for seats whose room no longer exists
+        query = '''
+            SELECT sa.room_id, r.capacity, COUNT(*) AS occupied
+            FROM seating_arrangements sa
+            LEFT JOIN rooms r ON r.room_id = sa.room_id
+            WHERE sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
+            GROUP BY sa.room_id
+            ORDER BY sa.room_id
         '''
-        rooms_used = db_manager.execute_query(rooms_query, (exam_date, session_time), fetch_one=True)[0]
+        rows = db_manager.query(query, (exam_date, session_time), tuples=True)
         
-        # Room utilization
-        utilization_query = '''
-            SELECT r.room_id, r.capacity, COUNT(sa.id) as occupied
-            FROM rooms r
-            LEFT JOIN seating_arrangements sa ON r.room_id = sa.room_id 
-                AND sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
-            WHERE r.room_id IN (
-                SELECT DISTINCT room_id FROM seating_arrangements 
-                WHERE exam_date = ? AND session_time = ? AND is_active = 1
-            )
-            GROUP BY r.room_id, r.capacity
-        '''
-        utilization_data = db_manager.execute_query(
-            utilization_query, (exam_date, session_time, exam_date, session_time)
-        )
+        total_students = sum(occupied for _, _, occupied in rows)
+        utilization_data = [{'room_id': room_id, 'capacity': capacity, 'occupied': occupied}
+                            for room_id, capacity, occupied in rows if capacity is not None]
         
         avg_occupancy = 0
         if utilization_data:
@@ -381,72 +382,54 @@ class SeatingAlgorithm:
         
         return {
             'total_students': total_students,
-            'rooms_used': rooms_used,
+            'rooms_used': len(rows),
             'avg_occupancy': round(avg_occupancy, 1),
-            'room_details': [dict(row) for row in utilization_data] if utilization_data else []
+            'room_details': utilization_data
         }
     
     def validate_arrangement(self, exam_date, session_time):
         """Validate a seating arrangement for conflicts"""
-        conflicts = []
-        
-        # Get all arrangements for the session
+        # Pair every seat with its occupied neighbours (including diagonals)
+        # that share a department or subject
         query = '''
-            SELECT sa.*, s.name as student_name, s.department, sub.subject_name
-            FROM seating_arrangements sa
-            JOIN students s ON sa.student_id = s.student_id
-            JOIN subjects sub ON sa.subject_code = sub.subject_code
-            WHERE sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
-            ORDER BY sa.room_id, sa.seat_row, sa.seat_col
+            SELECT a.room_id,
+                   a.student_id, s1.name AS student_name, a.seat_row, a.seat_col,
+                   s1.department, a.subject_code,
+                   b.student_id AS adj_student_id, s2.name AS adj_student_name,
+                   b.seat_row AS adj_seat_row, b.seat_col AS adj_seat_col,
+                   s2.department AS adj_department, b.subject_code AS adj_subject_code
+            FROM seating_arrangements a
+            JOIN students s1 ON s1.id = a.student_pk
+            JOIN seating_arrangements b ON b.room_id = a.room_id
+                AND b.exam_date = a.exam_date AND b.session_time = a.session_time
+                AND b.seat_row BETWEEN a.seat_row - 1 AND a.seat_row + 1
+                AND b.seat_col BETWEEN a.seat_col - 1 AND a.seat_col + 1
+                AND b.id != a.id AND b.is_active = 1
+            JOIN students s2 ON s2.id = b.student_pk
+            WHERE a.exam_date = ? AND a.session_time = ? AND a.is_active = 1
+                AND (s1.department = s2.department OR a.subject_code = b.subject_code)
+            ORDER BY a.room_id, a.seat_row, a.seat_col, b.seat_row, b.seat_col
         '''
-        arrangements = db_manager.execute_query(query, (exam_date, session_time))
+        rows = db_manager.query(query, (exam_date, session_time))
         
-        # Group by room
-        room_arrangements = defaultdict(list)
-        for arr in arrangements:
-            room_arrangements[arr['room_id']].append(dict(arr))
-        
-        # Check for conflicts in each room
-        for room_id, room_seats in room_arrangements.items():
-            # Create position map
-            position_map = {}
-            for seat in room_seats:
-                position_map[(seat['seat_row'], seat['seat_col'])] = seat
-            
-            # Check each seat for conflicts
-            for seat in room_seats:
-                row, col = seat['seat_row'], seat['seat_col']
-                
-                # Check adjacent positions
-                directions = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
-                for dr, dc in directions:
-                    adj_pos = (row + dr, col + dc)
-                    if adj_pos in position_map:
-                        adj_seat = position_map[adj_pos]
-                        
-                        # Check for department or subject conflicts
-                        if (seat['department'] == adj_seat['department'] or
-                            seat['subject_code'] == adj_seat['subject_code']):
-                            conflicts.append({
-                                'type': 'adjacent_conflict',
-                                'room_id': room_id,
-                                'student1': {
-                                    'id': seat['student_id'],
-                                    'name': seat['student_name'],
-                                    'position': f"{row}-{col}",
-                                    'department': seat['department'],
-                                    'subject': seat['subject_code']
-                                },
-                                'student2': {
-                                    'id': adj_seat['student_id'],
-                                    'name': adj_seat['student_name'],
-                                    'position': f"{adj_seat['seat_row']}-{adj_seat['seat_col']}",
-                                    'department': adj_seat['department'],
-                                    'subject': adj_seat['subject_code']
-                                }
-                            })
-        
-        return conflicts
+        return [{
+            'type': 'adjacent_conflict',
+            'room_id': row['room_id'],
+            'student1': {
+                'id': row['student_id'],
+                'name': row['student_name'],
+                'position': f"{row['seat_row']}-{row['seat_col']}",
+                'department': row['department'],
+                'subject': row['subject_code']
+            },
+            'student2': {
+                'id': row['adj_student_id'],
+                'name': row['adj_student_name'],
+                'position': f"{row['adj_seat_row']}-{row['adj_seat_col']}",
+                'department': row['adj_department'],
+                'subject': row['adj_subject_code']
+            }
+        } for row in rows]
 
 # Global seating algorithm instance
 seating_algorithm = SeatingAlgorithm()
\ No newline at end of file
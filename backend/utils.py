@@ -4,14 +4,53 @@ Utility functions for the Examination Seating System
 import os
 import csv
 import json
+import re
+import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
-import uuid
-import hashlib
+from itertools import islice
+import secrets
 from werkzeug.utils import secure_filename
 from backend.database import db_manager
 from backend.models import Student, Subject, Room, Exam, Invigilator
 
+# Students written per batch by the CSV export, each page costing one subjects query
+EXPORT_PAGE_SIZE = 500
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NON_DIGIT_RE = re.compile(r'\D')
+
+def _csv_records(file):
+    """Yield each non-blank CSV row as a header-keyed dict, like csv.DictReader but cheaper"""
+    reader = csv.reader(file)
+    header = next(reader, [])
+    width = len(header)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            # Missing trailing fields read as None, as with DictReader
+            row += [None] * (width - len(row))
+        yield dict(zip(header, row))
+
+def _save_rows(numbered, save, results):
+    """Save (row_num, item) pairs in one batch; if the batch breaks a database
+    constraint, save them one by one and report only the offending rows"""
+    items = [item for _, item in numbered]
+    try:
+        save(items)
+        return items
+    except sqlite3.IntegrityError:
+        pass
+    saved = []
+    for row_num, item in numbered:
+        try:
+            save([item])
+            saved.append(item)
+        except sqlite3.IntegrityError as e:
+            results['errors'].append(f'Row {row_num}: {str(e)}')
+    return saved
+
 class DataImporter:
     """Handle data import operations"""
     
@@ -32,10 +71,13 @@ class DataImporter:
         }
         
         try:
+            existing_ids = {row[0] for row in
+                            db_manager.query('SELECT student_id FROM students', tuples=True)}
+            students = []
+            enrollments = {}
+            
             with open(file_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row_num, row in enumerate(reader, start=2):
+                for row_num, row in enumerate(_csv_records(file), start=2):
                     try:
                         # Validate required fields
                         if not row.get('student_id') or not row.get('name'):
@@ -43,14 +85,14 @@ class DataImporter:
                             continue
                         
                         # Check for duplicate
-                        existing = Student.get_by_id(row['student_id'].strip())
-                        if existing:
+                        student_id = row['student_id'].strip()
+                        if student_id in existing_ids:
                             results['duplicates'] += 1
                             continue
                         
                         # Create student
                         student = Student(
-                            student_id=row['student_id'].strip(),
+                            student_id=student_id,
                             name=row['name'].strip(),
                             department=row.get('department', '').strip(),
                             semester=int(row.get('semester', 1)),
@@ -61,20 +103,23 @@ class DataImporter:
                             guardian_phone=row.get('guardian_phone', '').strip()
                         )
                         
-                        student.save()
-                        
                         # Handle subject enrollments
                         subjects = row.get('subjects', '').strip()
-                        if subjects:
-                            subject_codes = [s.strip() for s in subjects.split(',')]
-                            for subject_code in subject_codes:
-                                if subject_code:
-                                    student.enroll_subject(subject_code)
+                        subject_codes = [s.strip() for s in subjects.split(',')] if subjects else []
                         
-                        results['success'] += 1
+                        students.append((row_num, student))
+                        enrollments[student_id] = [(student_id, code, 1) for code in subject_codes if code]
+                        existing_ids.add(student_id)
                         
                     except Exception as e:
                         results['errors'].append(f'Row {row_num}: {str(e)}')
+            
+            # Write all students and enrollments in one transaction each
+            saved = _save_rows(students, Student.bulk_save, results)
+            db_manager.bulk_insert('student_subjects', ('student_id', 'subject_code', 'is_active'),
+                                   [row for student in saved for row in enrollments[student.student_id]],
+                                   on_conflict='REPLACE')
+            results['success'] = len(saved)
         
         except Exception as e:
             results['errors'].append(f'File error: {str(e)}')
@@ -90,10 +135,12 @@ class DataImporter:
         }
         
         try:
+            existing_codes = {row[0] for row in
+                              db_manager.query('SELECT subject_code FROM subjects', tuples=True)}
+            subjects = []
+            
             with open(file_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row_num, row in enumerate(reader, start=2):
+                for row_num, row in enumerate(_csv_records(file), start=2):
                     try:
                         # Validate required fields
                         if not row.get('subject_code') or not row.get('subject_name'):
@@ -101,26 +148,26 @@ class DataImporter:
                             continue
                         
                         # Check for duplicate
-                        existing = Subject.get_by_code(row['subject_code'].strip())
-                        if existing:
+                        subject_code = row['subject_code'].strip()
+                        if subject_code in existing_codes:
                             results['duplicates'] += 1
                             continue
                         
                         # Create subject
-                        subject = Subject(
-                            subject_code=row['subject_code'].strip(),
+                        subjects.append((row_num, Subject(
+                            subject_code=subject_code,
                             subject_name=row['subject_name'].strip(),
                             department=row.get('department', '').strip(),
                             semester=int(row.get('semester', 1)),
                             credits=int(row.get('credits', 3)),
                             subject_type=row.get('subject_type', 'theory').strip()
-                        )
-                        
-                        subject.save()
-                        results['success'] += 1
+                        )))
+                        existing_codes.add(subject_code)
                         
                     except Exception as e:
                         results['errors'].append(f'Row {row_num}: {str(e)}')
+            
+            results['success'] = len(_save_rows(subjects, Subject.bulk_save, results))
         
         except Exception as e:
             results['errors'].append(f'File error: {str(e)}')
@@ -136,10 +183,12 @@ class DataImporter:
         }
         
         try:
+            existing_ids = {row[0] for row in
+                            db_manager.query('SELECT room_id FROM rooms', tuples=True)}
+            rooms = []
+            
             with open(file_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row_num, row in enumerate(reader, start=2):
+                for row_num, row in enumerate(_csv_records(file), start=2):
                     try:
                         # Validate required fields
                         if not row.get('room_id') or not row.get('name'):
@@ -147,14 +196,14 @@ class DataImporter:
                             continue
                         
                         # Check for duplicate
-                        existing = Room.get_by_id(row['room_id'].strip())
-                        if existing:
+                        room_id = row['room_id'].strip()
+                        if room_id in existing_ids:
                             results['duplicates'] += 1
                             continue
                         
                         # Create room
                         room = Room(
-                            room_id=row['room_id'].strip(),
+                            room_id=room_id,
                             name=row['name'].strip(),
                             rows=int(row.get('rows', 10)),
                             cols=int(row.get('cols', 10)),
@@ -165,11 +214,16 @@ class DataImporter:
                             facilities=row.get('facilities', '').strip()
                         )
                         
-                        room.save()
-                        results['success'] += 1
+                        # Validate per row so a bad room is reported, not the batch
+                        room._validate()
+                        rooms.append((row_num, room))
+                        existing_ids.add(room_id)
                         
                     except Exception as e:
                         results['errors'].append(f'Row {row_num}: {str(e)}')
+            
+            saved = _save_rows(rooms, lambda batch: Room.bulk_save(batch, validated=True), results)
+            results['success'] = len(saved)
         
         except Exception as e:
             results['errors'].append(f'File error: {str(e)}')
@@ -189,41 +243,41 @@ class DataExporter:
         filepath = os.path.join(self.export_dir, filename)
         
         # Get students based on filters
-        students = Student.get_all(
+        students = Student.iter_all(
             department=filters.get('department') if filters else None,
             semester=filters.get('semester') if filters else None,
             search=filters.get('search') if filters else None
         )
+        count = 0
         
         with open(filepath, 'w', newline='', encoding='utf-8') as file:
             fieldnames = ['student_id', 'name', 'department', 'semester', 'email', 'phone', 
                          'address', 'guardian_name', 'guardian_phone', 'subjects']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer = csv.writer(file)
             
-            writer.writeheader()
-            for student in students:
-                # Get enrolled subjects
-                subjects = student.get_subjects()
-                subject_codes = ','.join([s['subject_code'] for s in subjects])
-                
-                writer.writerow({
-                    'student_id': student.student_id,
-                    'name': student.name,
-                    'department': student.department,
-                    'semester': student.semester,
-                    'email': student.email or '',
-                    'phone': student.phone or '',
-                    'address': student.address or '',
-                    'guardian_name': student.guardian_name or '',
-                    'guardian_phone': student.guardian_phone or '',
-                    'subjects': subject_codes
-                })
+            writer.writerow(fieldnames)
+            # Fetch enrolled subjects one page of students at a time
+            while page := list(islice(students, EXPORT_PAGE_SIZE)):
+                subjects = Student.get_subject_codes_multi(student.student_id for student in page)
+                writer.writerows((
+                    student.student_id,
+                    student.name,
+                    student.department,
+                    student.semester,
+                    student.email or '',
+                    student.phone or '',
+                    student.address or '',
+                    student.guardian_name or '',
+                    student.guardian_phone or '',
+                    ','.join(subjects[student.student_id])
+                ) for student in page)
+                count += len(page)
         
         return {
             'success': True,
             'filename': filename,
             'filepath': filepath,
-            'count': len(students)
+            'count': count
         }
     
     def export_subjects_to_csv(self, filters=None):
@@ -240,22 +294,20 @@ class DataExporter:
         with open(filepath, 'w', newline='', encoding='utf-8') as file:
             fieldnames = ['subject_code', 'subject_name', 'department', 'semester', 
                          'credits', 'subject_type', 'enrolled_students']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer = csv.writer(file)
             
-            writer.writeheader()
-            for subject in subjects:
-                # Get enrolled students count
-                enrolled = subject.get_enrolled_students()
-                
-                writer.writerow({
-                    'subject_code': subject.subject_code,
-                    'subject_name': subject.subject_name,
-                    'department': subject.department,
-                    'semester': subject.semester,
-                    'credits': subject.credits,
-                    'subject_type': subject.subject_type,
-                    'enrolled_students': len(enrolled)
-                })
+            writer.writerow(fieldnames)
+            # Count enrollments for every subject in one query
+            enrolled = Subject.count_enrolled_multi(s.subject_code for s in subjects)
+            writer.writerows((
+                subject.subject_code,
+                subject.subject_name,
+                subject.department,
+                subject.semester,
+                subject.credits,
+                subject.subject_type,
+                enrolled[subject.subject_code]
+            ) for subject in subjects)
         
         return {
             'success': True,
@@ -285,9 +337,7 @@ class ValidationUtils:
         if not email:
             return True, ""  # Email is optional
         
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        if not EMAIL_RE.match(email):
             return False, "Invalid email format"
         
         return True, ""
@@ -298,9 +348,8 @@ class ValidationUtils:
         if not phone:
             return True, ""  # Phone is optional
         
-        import re
         # Remove all non-digit characters
-        digits_only = re.sub(r'\D', '', phone)
+        digits_only = NON_DIGIT_RE.sub('', phone)
         
         if len(digits_only) < 10 or len(digits_only) > 15:
             return False, "Phone number must be between 10 and 15 digits"
@@ -334,7 +383,7 @@ class SecurityUtils:
     @staticmethod
     def generate_api_key():
         """Generate a secure API key"""
-        return hashlib.sha256(str(uuid.uuid4()).encode()).hexdigest()
+        return secrets.token_hex(32)
     
     @staticmethod
     def hash_password(password):
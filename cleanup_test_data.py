@@ -15,19 +15,12 @@ def cleanup_all_test_data():
     """Clean up all test data"""
     print("🧹 Cleaning up all test data...")
     
-    # Get all students and find test ones
-    all_students = Student.get_all()
+    # Soft delete every test student in a single transaction
     test_prefixes = ['TEST', 'CSV', 'DELETE', 'SEARCH', 'CSE', 'IT', 'ME']
-    
-    deleted_count = 0
-    for student in all_students:
-        if any(student.student_id.startswith(prefix) for prefix in test_prefixes):
-            try:
-                student.delete()
-                print(f"   🗑️  Deleted: {student.student_id} - {student.name}")
-                deleted_count += 1
-            except Exception as e:
-                print(f"   ⚠️  Could not delete {student.student_id}: {e}")
+    deleted = Student.delete_by_prefix(test_prefixes)
+    for student_id, name in deleted:
+        print(f"   🗑️  Deleted: {student_id} - {name}")
+    deleted_count = len(deleted)
     
     print(f"\n✅ Cleanup complete. Deleted {deleted_count} test records.")
 
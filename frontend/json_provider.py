@@ -0,0 +1,34 @@
+"""
+JSON provider that serializes sqlite3.Row objects without copying them into dicts first
+"""
+import sqlite3
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+class RowJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that understands sqlite3.Row and uses orjson when available"""
+
+    @staticmethod
+    def default(o):
+        """Encode sqlite3.Row as a mapping, defer everything else to Flask"""
+        if isinstance(o, sqlite3.Row):
+            return dict(zip(o.keys(), o))
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string"""
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+
+        indent = kwargs.get('indent')
+        # Dates go through Flask's default so the output format is unchanged
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
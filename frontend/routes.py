@@ -110,8 +110,8 @@ def list_students():
                               search=search if search else None)
     
     # Get filter options
-    departments = db_manager.execute_query('SELECT DISTINCT department FROM students WHERE is_active = 1 ORDER BY department')
-    semesters = db_manager.execute_query('SELECT DISTINCT semester FROM students WHERE is_active = 1 ORDER BY semester')
+    departments = db_manager.execute_query('SELECT DISTINCT department FROM students WHERE is_active = 1 ORDER BY department', cached=True)
+    semesters = db_manager.execute_query('SELECT DISTINCT semester FROM students WHERE is_active = 1 ORDER BY semester', cached=True)
     
     return render_template('students/list.html', 
                          students=students, 
@@ -148,9 +148,7 @@ def add_student():
             
             # Enroll in subjects
             subjects = request.form.getlist('subjects')
-            for subject_code in subjects:
-                if subject_code:
-                    student.enroll_subject(subject_code)
+            student.enroll_many(code for code in subjects if code)
             
             # Log action
             db_manager.log_action(session['admin_id'], 'create', 'students', student.student_id)
@@ -190,14 +188,11 @@ def edit_student(student_id):
             new_subjects = request.form.getlist('subjects')
             
             # Unenroll from removed subjects
-            for subject_code in current_subjects:
-                if subject_code not in new_subjects:
-                    student.unenroll_subject(subject_code)
+            student.unenroll_many(code for code in current_subjects if code not in new_subjects)
             
             # Enroll in new subjects
-            for subject_code in new_subjects:
-                if subject_code and subject_code not in current_subjects:
-                    student.enroll_subject(subject_code)
+            student.enroll_many(code for code in new_subjects
+                                if code and code not in current_subjects)
             
             # Log action
             db_manager.log_action(session['admin_id'], 'update', 'students', student_id)
@@ -279,11 +274,17 @@ def import_students():
                 flash(f'Invalid CSV format: Missing required headers: {", ".join(missing_headers)}', 'error')
                 return render_template('students/import.html')
             
+            # Parse and validate every row before taking the write lock
+            existing_ids = {row[0] for row in
+                            db_manager.query('SELECT student_id FROM students', tuples=True)}
+            active_codes = {row[0] for row in
+                            db_manager.query('SELECT subject_code FROM subjects WHERE is_active = 1', tuples=True)}
+            pending = []
             for row_num, row in enumerate(csv_input, start=2):
                 try:
                     # Create a case-insensitive row dict
                     row_dict = {k.lower().strip(): v.strip() if v else '' for k, v in row.items()}
-                    
+                
                     student = Student(
                         student_id=row_dict.get('student_id', ''),
                         name=row_dict.get('name', ''),
@@ -292,53 +293,59 @@ def import_students():
                         email=row_dict.get('email', ''),
                         phone=row_dict.get('phone', '')
                     )
-                    
+                
                     if not student.student_id or not student.name:
                         errors.append(f'Row {row_num}: Student ID and Name are required')
                         continue
-                    
+                
                     if not student.department:
                         errors.append(f'Row {row_num}: Department is required')
                         continue
-                        
+                    
                     if student.semester < 1 or student.semester > 8:
                         errors.append(f'Row {row_num}: Semester must be between 1 and 8')
                         continue
-                    
+                
                     # Check if student already exists
-                    existing = Student.get_by_id(student.student_id)
-                    if existing:
+                    if student.student_id in existing_ids:
                         errors.append(f'Row {row_num}: Student ID {student.student_id} already exists')
                         continue
-                    
-                    # Save student
-                    student.save()
-                    imported_count += 1
+                    existing_ids.add(student.student_id)
 
                     # Optional subjects enrollment via CSV column 'subjects'
+                    subject_codes = []
                     subjects_field = row_dict.get('subjects', '')
                     if subjects_field:
                         # Split by comma, strip, dedupe
                         raw_codes = [c.strip() for c in subjects_field.split(',') if c is not None]
                         seen = set()
-                        subject_codes = []
                         for code in raw_codes:
                             if code and code not in seen:
                                 seen.add(code)
-                                subject_codes.append(code)
-                        for code in subject_codes:
-                            subj = Subject.get_by_code(code)
-                            if subj:
-                                try:
-                                    student.enroll_subject(code)
-                                except Exception as enroll_err:
-                                    errors.append(f"Row {row_num}: Failed to enroll subject {code}: {str(enroll_err)}")
-                            else:
-                                errors.append(f"Row {row_num}: Subject code {code} not found - skipped")
+                                if code in active_codes:
+                                    subject_codes.append(code)
+                                else:
+                                    errors.append(f"Row {row_num}: Subject code {code} not found - skipped")
                     
+                    pending.append((row_num, student, subject_codes))
+                
                 except Exception as e:
                     errors.append(f'Row {row_num}: {str(e)}')
             
+            # Save the validated rows and their enrollments in one short transaction
+            with db_manager.transaction():
+                for row_num, student, subject_codes in pending:
+                    try:
+                        student.save()
+                        imported_count += 1
+                        for code in subject_codes:
+                            try:
+                                student.enroll_subject(code)
+                            except Exception as enroll_err:
+                                errors.append(f"Row {row_num}: Failed to enroll subject {code}: {str(enroll_err)}")
+                    except Exception as e:
+                        errors.append(f'Row {row_num}: {str(e)}')
+            
             # Log action
             db_manager.log_action(session['admin_id'], 'import', 'students', f'{imported_count} students')
             
@@ -375,8 +382,8 @@ def list_subjects():
                               search=search if search else None)
     
     # Get filter options
-    departments = db_manager.execute_query('SELECT DISTINCT department FROM subjects WHERE is_active = 1 ORDER BY department')
-    semesters = db_manager.execute_query('SELECT DISTINCT semester FROM subjects WHERE is_active = 1 ORDER BY semester')
+    departments = db_manager.execute_query('SELECT DISTINCT department FROM subjects WHERE is_active = 1 ORDER BY department', cached=True)
+    semesters = db_manager.execute_query('SELECT DISTINCT semester FROM subjects WHERE is_active = 1 ORDER BY semester', cached=True)
     
     return render_template('subjects/list.html', 
                          subjects=subjects, 
@@ -478,8 +485,8 @@ def list_rooms():
                         floor=int(floor) if floor else None)
     
     # Get filter options
-    buildings = db_manager.execute_query('SELECT DISTINCT building FROM rooms WHERE is_active = 1 AND building IS NOT NULL ORDER BY building')
-    floors = db_manager.execute_query('SELECT DISTINCT floor FROM rooms WHERE is_active = 1 AND floor IS NOT NULL ORDER BY floor')
+    buildings = db_manager.execute_query('SELECT DISTINCT building FROM rooms WHERE is_active = 1 AND building IS NOT NULL ORDER BY building', cached=True)
+    floors = db_manager.execute_query('SELECT DISTINCT floor FROM rooms WHERE is_active = 1 AND floor IS NOT NULL ORDER BY floor', cached=True)
     
     return render_template('rooms/list.html', 
                          rooms=rooms, 
@@ -742,8 +749,7 @@ def session_exams():
         WHERE e.exam_date = ? AND e.start_time = ? AND e.is_active = 1
         ORDER BY s.subject_name
     '''
-    rows = db_manager.execute_query(query, (exam_date, session_time))
-    exams = [dict(r) for r in rows] if rows else []
+    exams = db_manager.execute_query(query, (exam_date, session_time))
     return jsonify({'success': True, 'exams': exams})
 
 @seating_bp.route('/view')
@@ -761,9 +767,9 @@ def view_seating():
         SELECT sa.*, s.name as student_name, sub.subject_name, r.name as room_name,
                r.rows, r.cols, r.capacity
         FROM seating_arrangements sa
-        JOIN students s ON sa.student_id = s.student_id
-        JOIN subjects sub ON sa.subject_code = sub.subject_code
-        JOIN rooms r ON sa.room_id = r.room_id
+        JOIN students s ON s.id = sa.student_pk
+        JOIN subjects sub ON sub.id = sa.subject_pk
+        JOIN rooms r ON r.id = sa.room_pk
         WHERE sa.exam_date = ? AND sa.session_time = ? AND sa.is_active = 1
         ORDER BY sa.room_id, sa.seat_row, sa.seat_col
     '''
@@ -799,7 +805,7 @@ def list_invigilators():
                                      search=search if search else None)
     
     # Get filter options
-    departments = db_manager.execute_query('SELECT DISTINCT department FROM invigilators WHERE is_active = 1 AND department IS NOT NULL ORDER BY department')
+    departments = db_manager.execute_query('SELECT DISTINCT department FROM invigilators WHERE is_active = 1 AND department IS NOT NULL ORDER BY department', cached=True)
     
     return render_template('invigilators/list.html', 
                          invigilators=invigilators, 
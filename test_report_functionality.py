@@ -546,6 +546,91 @@ class TestReportFunctionality(unittest.TestCase):
         except Exception as e:
             self.fail(f"TC-REPORT-05 failed: {str(e)}")
 
+    def test_tc_report_06_room_utilization(self):
+        """TC-REPORT-06: Room utilization report totals match the seating data"""
+        print("\n🧪 Testing TC-REPORT-06: Room utilization report")
+        
+        pdf_result = report_generator.generate_room_utilization_report(format='pdf')
+        self.assertTrue(pdf_result['success'], pdf_result.get('message'))
+        
+        excel_result = report_generator.generate_room_utilization_report(
+            date_from=self.test_exam_date,
+            date_to=self.test_exam_date,
+            format='excel'
+        )
+        self.assertTrue(excel_result['success'], excel_result.get('message'))
+        
+        from openpyxl import load_workbook
+        sheet = load_workbook(excel_result['filepath'], read_only=True)['Room Utilization']
+        report = {row[0]: row for row in sheet.iter_rows(min_row=2, values_only=True)}
+        
+        expected = db_manager.execute_query('''
+            SELECT room_id, COUNT(*) as allocated, COUNT(DISTINCT session_time) as sessions
+            FROM seating_arrangements
+            WHERE exam_date = ? AND is_active = 1
+            GROUP BY room_id
+        ''', (self.test_exam_date,))
+        for row in expected:
+            room_id, _, _, _, capacity, total_allocations, sessions_used, avg_occupancy = report[row['room_id']]
+            self.assertEqual(total_allocations, row['allocated'])
+            self.assertEqual(sessions_used, row['sessions'])
+            self.assertAlmostEqual(avg_occupancy, round(row['allocated'] * 100.0 / capacity / row['sessions'], 2))
+        
+        print(f"   ✅ Utilization verified for {len(expected)} rooms")
+    
+    def test_tc_report_07_generate_all_formats(self):
+        """TC-REPORT-07: Generate PDF, Excel and CSV seating reports in one call"""
+        print("\n🧪 Testing TC-REPORT-07: All seating report formats")
+        
+        result = report_generator.generate_seating_all(self.test_exam_date, self.test_exam_time)
+        self.assertTrue(result['success'], result.get('message'))
+        self.assertEqual(set(result['reports']), {'pdf', 'excel', 'csv'})
+        
+        for format_type, report in result['reports'].items():
+            self.assertTrue(report['success'], report.get('message'))
+            self.assertGreater(os.path.getsize(report['filepath']), 100)
+            print(f"   ✅ {format_type.upper()}: {report['filename']}")
+    
+    def test_tc_report_08_raw_xml_workbook(self):
+        """TC-REPORT-08: Raw XML workbook engine reads back the same as openpyxl"""
+        print("\n🧪 Testing TC-REPORT-08: Raw XML workbook engine")
+        
+        from openpyxl import load_workbook
+        from backend.reports import _write_xlsx
+        
+        rows = [('Room <A> & B', None, 2, '1-1', 'S1', ' padded ', 3.5)]
+        sheets = [('Summary', ('Metric', 'Value'), [('Total', 1)]),
+                  ("Room's <A>", ('Room', 'Building', 'Floor', 'Seat', 'ID', 'Name', 'Score'), rows)]
+        
+        values = {}
+        for engine in ('openpyxl', 'rawxml'):
+            filepath = os.path.join(self.temp_dir, f'{engine}.xlsx')
+            _write_xlsx(filepath, sheets, engine=engine)
+            workbook = load_workbook(filepath, read_only=True)
+            values[engine] = {name: list(workbook[name].iter_rows(values_only=True))
+                              for name in workbook.sheetnames}
+        
+        self.assertEqual(values['rawxml'], values['openpyxl'])
+        print(f"   ✅ Raw XML workbook matches openpyxl output")
+    
+    def test_tc_report_09_seating_rows_ordered(self):
+        """TC-REPORT-09: Seating rows arrive ordered by room and seat for the writers"""
+        print("\n🧪 Testing TC-REPORT-09: Seating row order")
+        
+        result = report_generator.generate_seating_arrangement_report(
+            self.test_exam_date, self.test_exam_time, format='csv'
+        )
+        self.assertTrue(result['success'], result.get('message'))
+        
+        import csv
+        with open(result['filepath'], newline='', encoding='utf-8') as csvfile:
+            keys = [(row['room_name'], *map(int, row['seat_position'].split('-')))
+                    for row in csv.DictReader(csvfile)]
+        
+        self.assertGreater(len(keys), 0)
+        self.assertEqual(keys, sorted(keys))
+        print(f"   ✅ {len(keys)} seats ordered by room, row and column")
+    
 def run_report_tests():
     """Run all report functionality tests"""
     print("=" * 80)
@@ -564,7 +649,11 @@ def run_report_tests():
         'test_tc_report_02_generate_hall_tickets', 
         'test_tc_report_03_download_summary_report',
         'test_tc_report_04_report_data_accuracy',
-        'test_tc_report_05_error_handling'
+        'test_tc_report_05_error_handling',
+        'test_tc_report_06_room_utilization',
+        'test_tc_report_07_generate_all_formats',
+        'test_tc_report_08_raw_xml_workbook',
+        'test_tc_report_09_seating_rows_ordered'
     ]
     
     for test_case in test_cases:
@@ -321,6 +321,36 @@ class TestRoomManagement(unittest.TestCase):
             print(f"   📝 Error: {str(e)}")
             self.fail(f"Capacity auto-calculation test failed: {str(e)}")
 
+    def test_room_status_and_availability(self):
+        """Additional test: Occupancy status and batched availability checks"""
+        print("\n🧪 Testing Additional: Room status and availability")
+
+        import time
+        room_id = f'STATUS{int(time.time() * 1000) % 10**8}'
+        room = self.Room(room_id=room_id, name='Status Test Room', rows=2, cols=2, capacity=4)
+        room.save()
+        self.db_manager.execute_query('''
+            INSERT INTO seating_arrangements (student_id, subject_code, room_id, seat_row, seat_col,
+            exam_date, session_time) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', ('TESTSTU', 'TESTSUB', room_id, 1, 1, '2099-01-01', 'morning'))
+
+        try:
+            status = room.get_status('2099-01-01', 'morning')
+            self.assertEqual(status['occupied'], 1)
+            self.assertEqual(status['available'], 3)
+            self.assertEqual(status['occupancy_rate'], 25)
+            self.assertFalse(room.is_available('2099-01-01', 'morning'))
+            self.assertEqual(room.get_occupancy('2099-01-01', 'morning'), status)
+
+            availability = room.is_available_many([('2099-01-01', 'morning'), ('2099-01-01', 'afternoon')])
+            self.assertEqual(availability, {('2099-01-01', 'morning'): False,
+                                            ('2099-01-01', 'afternoon'): True})
+            self.assertEqual(room.is_available_many([]), {})
+            print("✅ Additional: Room status and availability - PASS")
+        finally:
+            self.db_manager.execute_query('DELETE FROM seating_arrangements WHERE room_id = ?', (room_id,))
+            self.db_manager.execute_query('DELETE FROM rooms WHERE room_id = ?', (room_id,))
+
 def run_room_management_tests():
     """Run room management tests with detailed reporting"""
     print("=" * 80)
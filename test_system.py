@@ -30,6 +30,184 @@ class TestSystemComponents(unittest.TestCase):
         except Exception as e:
             self.fail(f"Database connection failed: {e}")
     
+    def test_bulk_insert(self):
+        """Test batched inserts in a single transaction"""
+        import tempfile
+        from backend.database import DatabaseManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = DatabaseManager(os.path.join(temp_dir, 'bulk_test.db'))
+            rows = [(f'BULK{i:04d}', f'Student {i}', 'CSE', 1) for i in range(1200)]
+            inserted = manager.bulk_insert('students', ('student_id', 'name', 'department', 'semester'),
+                                           rows, chunk=500)
+            self.assertEqual(inserted, 1200)
+            count = manager.execute_query('SELECT COUNT(*) FROM students', fetch_one=True)[0]
+            self.assertEqual(count, 1200)
+
+            # A failing batch is rolled back as a whole
+            with self.assertRaises(Exception):
+                manager.bulk_insert('students', ('student_id', 'name', 'department', 'semester'),
+                                    [('BULKNEW', 'New', 'CSE', 1), ('BULK0000', 'Dup', 'CSE', 1)])
+            self.assertIsNone(manager.execute_query(
+                'SELECT 1 FROM students WHERE student_id = ?', ('BULKNEW',), fetch_one=True))
+            manager.close_connections()
+            print("✅ Bulk insert test passed")
+
+    def test_search_index(self):
+        """Test the full-text search tables stay in sync with their content tables"""
+        import tempfile
+        from backend.database import DatabaseManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = DatabaseManager(os.path.join(temp_dir, 'search_test.db'))
+            search = 'SELECT rowid FROM students_fts WHERE students_fts MATCH ?'
+            manager.execute("INSERT INTO students (student_id, name, department, semester) "
+                            "VALUES ('FTS001', 'Priya Raman', 'CSE', 1)")
+            self.assertEqual(len(manager.query(search, ('"iya ra"',))), 1)
+            self.assertEqual(len(manager.query(search, ('"fts0"',))), 1)
+
+            manager.execute("UPDATE students SET name = 'Divya Raman' WHERE student_id = 'FTS001'")
+            self.assertEqual(len(manager.query(search, ('"priya"',))), 0)
+            self.assertEqual(len(manager.query(search, ('"divya"',))), 1)
+
+            manager.execute("DELETE FROM students WHERE student_id = 'FTS001'")
+            self.assertEqual(len(manager.query(search, ('"divya"',))), 0)
+            manager.close_connections()
+            print("✅ Search index test passed")
+
+    def test_query_cache_invalidation(self):
+        """Test cached lookups are dropped by writes and committed transactions"""
+        import sqlite3
+        import tempfile
+        from backend.database import DatabaseManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = DatabaseManager(os.path.join(temp_dir, 'cache_test.db'))
+            lookup = 'SELECT name FROM rooms WHERE room_id = ?'
+            self.assertIsNone(manager.query(lookup, ('CACHE1',), one=True, cached=True))
+
+            manager.execute("INSERT INTO rooms (room_id, name, rows, cols, capacity) "
+                            "VALUES ('CACHE1', 'Before', 1, 1, 1)")
+            self.assertEqual(manager.query(lookup, ('CACHE1',), one=True, cached=True)[0], 'Before')
+
+            with manager.transaction() as conn:
+                conn.execute("UPDATE rooms SET name = 'After' WHERE room_id = 'CACHE1'")
+            self.assertEqual(manager.query(lookup, ('CACHE1',), one=True, cached=True)[0], 'After')
+
+            # Commits from connections the manager does not own (app.py, other processes)
+            conn = sqlite3.connect(manager.db_path)
+            with conn:
+                conn.execute("UPDATE rooms SET name = 'Elsewhere' WHERE room_id = 'CACHE1'")
+            conn.close()
+            self.assertEqual(manager.query(lookup, ('CACHE1',), one=True, cached=True)[0], 'Elsewhere')
+            manager.close_connections()
+            print("✅ Query cache invalidation test passed")
+
+    def test_query_cache_consistency(self):
+        """Test uncommitted and raced reads are never stored in the query cache"""
+        import tempfile
+        from backend.database import DatabaseManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = DatabaseManager(os.path.join(temp_dir, 'cache_race_test.db'))
+            lookup = 'SELECT name FROM rooms WHERE room_id = ?'
+            manager.execute("INSERT INTO rooms (room_id, name, rows, cols, capacity) "
+                            "VALUES ('CACHE2', 'Committed', 1, 1, 1)")
+
+            # A read inside a transaction that is rolled back must not leak out
+            with self.assertRaises(RuntimeError):
+                with manager.transaction() as conn:
+                    conn.execute("UPDATE rooms SET name = 'Pending' WHERE room_id = 'CACHE2'")
+                    self.assertEqual(manager.query(lookup, ('CACHE2',), one=True, cached=True)[0], 'Pending')
+                    self.assertEqual(manager._query_cache, {})
+                    raise RuntimeError('roll back')
+            self.assertEqual(manager.query(lookup, ('CACHE2',), one=True, cached=True)[0], 'Committed')
+
+            # A clear that lands while a read is running keeps its result out of the cache
+            manager._get_thread_conn().create_function(
+                'clear_cache', 0, lambda: manager.clear_query_cache() or 1)
+            raced = 'SELECT name, clear_cache() FROM rooms WHERE room_id = ?'
+            self.assertEqual(manager.query(raced, ('CACHE2',), one=True, cached=True)[0], 'Committed')
+            self.assertFalse(any(key[0] == raced for key in manager._query_cache))
+            manager.close_connections()
+            print("✅ Query cache consistency test passed")
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), 'needs /proc to count open files')
+    def test_thread_connections_closed(self):
+        """Test short-lived threads do not leave their connections open"""
+        import gc
+        import tempfile
+        import threading
+        from backend.database import DatabaseManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = DatabaseManager(os.path.join(temp_dir, 'threads_test.db'))
+            manager.query('SELECT 1')
+            open_files = len(os.listdir('/proc/self/fd'))
+            threads = [threading.Thread(target=manager.query, args=('SELECT COUNT(*) FROM rooms',))
+                       for _ in range(50)]
+            for thread in threads:
+                thread.start()
+                thread.join()
+            # Each new thread prunes the connections of threads that have exited;
+            # SQLite may keep a few closed file handles around for reuse
+            self.assertLessEqual(len(os.listdir('/proc/self/fd')), open_files + 3)
+            # and a collected thread closes its connection right away
+            del threads, thread
+            gc.collect()
+            self.assertLessEqual(len(os.listdir('/proc/self/fd')), open_files + 3)
+            manager.close_connections()
+            print("✅ Thread connection cleanup test passed")
+
+    def test_audit_log_buffering(self):
+        """Test buffered audit rows are written by flush_logs and failed batches are logged"""
+        import tempfile
+        from backend.database import DatabaseManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = DatabaseManager(os.path.join(temp_dir, 'audit_test.db'))
+            for i in range(5):
+                manager.log_action(1, f'action{i}')
+            manager.flush_logs()
+            actions = [row[0] for row in manager.query('SELECT action FROM system_logs ORDER BY id')]
+            self.assertEqual(actions, [f'action{i}' for i in range(5)])
+
+            manager.execute('DROP TABLE system_logs')
+            with self.assertLogs('backend.database', level='ERROR') as logs:
+                manager.log_action(1, 'lost')
+                manager.flush_logs()
+            self.assertIn('Dropped 1 audit log rows', logs.output[0])
+            manager.close_connections()
+            print("✅ Audit log buffering test passed")
+
+    def test_audit_log_flushed_on_sigterm(self):
+        """Test buffered audit rows are written when the process receives SIGTERM"""
+        import signal
+        import sqlite3
+        import subprocess
+        import tempfile
+
+        root = os.path.dirname(os.path.abspath(__file__))
+        script = (
+            "import os, signal, sys, time\n"
+            f"sys.path.insert(0, {root!r})\n"
+            "import app_modular\n"
+            "app_modular.handle_sigterm()\n"
+            "app_modular.db_manager.log_action(1, 'sigterm')\n"
+            "os.kill(os.getpid(), signal.SIGTERM)\n"
+            "time.sleep(5)\n"
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = subprocess.run([sys.executable, '-c', script], cwd=temp_dir, timeout=30)
+            self.assertEqual(result.returncode, 128 + signal.SIGTERM)
+            conn = sqlite3.connect(os.path.join(temp_dir, 'exam_system.db'))
+            try:
+                count = conn.execute("SELECT COUNT(*) FROM system_logs WHERE action = 'sigterm'").fetchone()[0]
+            finally:
+                conn.close()
+            self.assertEqual(count, 1)
+            print("✅ Audit log SIGTERM flush test passed")
+
     def test_models_import(self):
         """Test model imports"""
         try:
@@ -125,6 +303,27 @@ class TestDataOperations(unittest.TestCase):
         except Exception as e:
             self.fail(f"Room creation failed: {e}")
 
+    def test_bulk_enrollment(self):
+        """Test enrolling and unenrolling several subjects at once"""
+        from backend.database import db_manager
+        codes = [subject.subject_code for subject in self.Subject.get_all()[:3]]
+        if len(codes) < 2:
+            self.skipTest("Needs at least two subjects in the database")
+
+        student_id = f'ENR{datetime.now():%H%M%S%f}'
+        student = self.Student(student_id=student_id, name='Enrollment Test', department='CSE', semester=1)
+        student.save()
+        try:
+            self.assertEqual(student.enroll_many(codes), len(codes))
+            self.assertEqual(sorted(s['subject_code'] for s in student.get_subjects()), sorted(codes))
+
+            self.assertEqual(student.unenroll_many(codes[1:]), len(codes) - 1)
+            self.assertEqual([s['subject_code'] for s in student.get_subjects()], codes[:1])
+            print("✅ Bulk enrollment test passed")
+        finally:
+            db_manager.execute('DELETE FROM student_subjects WHERE student_id = ?', (student_id,))
+            db_manager.execute('DELETE FROM students WHERE student_id = ?', (student_id,))
+
 class TestSeatingAlgorithm(unittest.TestCase):
     """Test seating algorithm"""
     